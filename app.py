@@ -1,24 +1,55 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity, get_jwt
 from flask_mail import Mail, Message
 from config import Config
-from models import db, Fornecedor, Documento, Homologacao, NotaFornecedor
+from models import (
+    db,
+    Fornecedor,
+    Documento,
+    Homologacao,
+    NotaFornecedor,
+    PlanilhaHomologado,
+    PlanilhaControleQualidade,
+    ResumoFornecedor,
+    Evento,
+    ImportacaoPlanilhas,
+)
 from werkzeug.security import generate_password_hash, check_password_hash
 import io
+import csv
+import json
 import random
 import base64
 import os
+import pickle
+import hashlib
+import uuid
 import shutil
+import tempfile
 import mimetypes
+import numpy as np
 import pandas as pd
 import math
+import re
+import sys
+import functools
+import itertools
 import unicodedata
+import threading
+import time
+import heapq
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from collections import OrderedDict
 from flask_cors import CORS
 from datetime import datetime, timedelta
 from werkzeug.utils import secure_filename
 from flask_migrate import Migrate
-from sqlalchemy import or_, inspect, text
+from sqlalchemy import and_, or_, select, union, inspect, text, func, event, case, literal_column, table, column, cast, Integer, bindparam, exists
+from sqlalchemy.orm import Session, selectinload, undefer
+from sqlalchemy.dialects.postgresql import insert as insert_postgresql
+from sqlalchemy.dialects.sqlite import insert as insert_sqlite
 
 mail = Mail()
 app = Flask(__name__)
@@ -300,14 +331,14 @@ CORS(
                 "Access-Control-Request-Method",
                 "Access-Control-Request-Headers"
             ],
-            "expose_headers": ["Content-Disposition", "Content-Type"],
+            "expose_headers": ["Content-Disposition", "Content-Type", "X-Proximo-Cursor", "X-Total-Count"],
             "supports_credentials": True,
             "max_age": 3600
         }
     },
     supports_credentials=True,
     allow_headers=['Content-Type', 'Authorization', 'X-Requested-With', 'Accept', 'Origin'],
-    expose_headers=['Content-Disposition', 'Content-Type'],
+    expose_headers=['Content-Disposition', 'Content-Type', 'X-Proximo-Cursor', 'X-Total-Count'],
     methods=['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS']
 )
 app.config.from_object(Config)
@@ -357,7 +388,7 @@ def _adicionar_headers_cors(response):
         response.headers.add('Access-Control-Allow-Headers', 
                             'Content-Type, Authorization, X-Requested-With, Accept, Origin')
     if 'Access-Control-Expose-Headers' not in response.headers:
-        response.headers.add('Access-Control-Expose-Headers', 'Content-Disposition, Content-Type')
+        response.headers.add('Access-Control-Expose-Headers', 'Content-Disposition, Content-Type, X-Proximo-Cursor, X-Total-Count')
     
     return response
 
@@ -442,6 +473,42 @@ def _ensure_documento_schema():
         print(f'Erro ao ajustar schema de documentos: {exc}')
 
 
+def _ensure_colunas_atualizacao():
+    """
+    Garante as colunas atualizado_em usadas pela sincronização incremental.
+
+    Adiciona atualizado_em a fornecedores e documentos quando faltar,
+    preenchendo os registros existentes com a data de cadastro/envio, e cria
+    os índices de atualizado_em das três tabelas consultadas por
+    /api/admin/fornecedores/changes.
+    """
+    colunas = {
+        'fornecedores': 'data_cadastro',
+        'documentos': 'data_upload',
+    }
+    try:
+        inspector = inspect(db.engine)
+        tabelas = set(inspector.get_table_names())
+        with db.engine.begin() as connection:
+            for tabela, coluna_origem in colunas.items():
+                if tabela not in tabelas:
+                    continue
+                existentes = {col['name'] for col in inspector.get_columns(tabela)}
+                if 'atualizado_em' not in existentes:
+                    connection.execute(text(f'ALTER TABLE {tabela} ADD COLUMN atualizado_em TIMESTAMP'))
+                    print(f'Coluna atualizado_em adicionada a {tabela}')
+                connection.execute(text(
+                    f'UPDATE {tabela} SET atualizado_em = {coluna_origem} WHERE atualizado_em IS NULL'
+                ))
+            for tabela in ('fornecedores', 'documentos', 'notas_fornecedores'):
+                if tabela in tabelas:
+                    connection.execute(text(
+                        f'CREATE INDEX IF NOT EXISTS ix_{tabela}_atualizado_em ON {tabela} (atualizado_em)'
+                    ))
+    except Exception as exc:
+        print(f'Erro ao ajustar colunas de atualização: {exc}')
+
+
 def _backfill_documento_conteudo():
     """
     Recupera o conteúdo de documentos que estão no banco sem dados binários.
@@ -452,7 +519,7 @@ def _backfill_documento_conteudo():
     encontrado. Também define o mime_type se não estiver definido.
     """
     try:
-        documentos_sem_conteudo = Documento.query.filter(
+        documentos_sem_conteudo = Documento.query.options(undefer(Documento.dados_arquivo)).filter(
             or_(Documento.dados_arquivo.is_(None), Documento.dados_arquivo == b'')
         ).all()
     except Exception as exc:
@@ -480,11 +547,150 @@ def _backfill_documento_conteudo():
         print(f'Falha ao persistir conteudo dos documentos: {exc}')
 
 
+def _registrar_evento(tipo, titulo, descricao=None, fornecedor_id=None, detalhes=None, referencia=None, criado_em=None):
+    """
+    Acrescenta um evento ao registro usado pelas notificações do painel admin.
+
+    O evento só é adicionado à sessão: é gravado no mesmo commit da alteração
+    que o originou.
+
+    Args:
+        tipo: Tipo do evento (cadastro, documento, nota, decisao)
+        titulo: Título exibido na notificação
+        descricao: Texto da notificação
+        fornecedor_id: ID do fornecedor relacionado
+        detalhes: Dicionário com dados adicionais
+        referencia: Identificador exibido ao cliente (ex.: 'documento-12')
+        criado_em: Momento do evento (padrão: agora)
+
+    Returns:
+        Objeto Evento adicionado à sessão
+    """
+    evento = Evento(
+        tipo=tipo,
+        titulo=titulo,
+        descricao=(descricao or '')[:255] or None,
+        fornecedor_id=fornecedor_id,
+        detalhes=detalhes,
+        referencia=referencia,
+        criado_em=criado_em or datetime.utcnow(),
+    )
+    db.session.add(evento)
+    return evento
+
+
+def _evento_cadastro(fornecedor):
+    """Registra o evento de cadastro de um fornecedor (já com id)."""
+    return _registrar_evento(
+        'cadastro',
+        'Novo fornecedor cadastrado',
+        fornecedor.nome,
+        fornecedor_id=fornecedor.id,
+        detalhes={'email': fornecedor.email, 'cnpj': fornecedor.cnpj},
+        referencia=f'cadastro-{fornecedor.id}',
+        criado_em=fornecedor.data_cadastro,
+    )
+
+
+def _evento_documento(documento, fornecedor):
+    """Registra o evento de envio de um documento (já com id)."""
+    return _registrar_evento(
+        'documento',
+        'Documento enviado',
+        f"{fornecedor.nome} anexou {documento.nome_documento}",
+        fornecedor_id=fornecedor.id,
+        detalhes={
+            'fornecedor': fornecedor.nome,
+            'documento': documento.nome_documento,
+            'categoria': documento.categoria
+        },
+        referencia=f'documento-{documento.id}',
+        criado_em=documento.data_upload,
+    )
+
+
+# Chave do advisory lock (PostgreSQL) que serializa _backfill_eventos entre workers.
+EVENTOS_HISTORICO_LOCK = 2104
+
+
+def _backfill_eventos():
+    """
+    Popula a tabela eventos na primeira execução com o histórico existente.
+
+    Se a tabela estiver vazia, gera os eventos de cadastro e de envio de
+    documentos a partir dos registros atuais, em ordem cronológica. Lê só as
+    colunas necessárias (sem o conteúdo dos documentos).
+
+    Roda em todos os workers que iniciam juntos, então a gravação é protegida:
+    cada evento é inserido com INSERT ... SELECT ... WHERE NOT EXISTS sobre
+    (tipo, referencia), e no PostgreSQL a transação ainda segura um advisory
+    lock para que os workers façam a verificação um de cada vez.
+    """
+    try:
+        if db.session.query(Evento.id).first() is not None:
+            return
+        if db.engine.dialect.name == 'postgresql':
+            db.session.execute(text('SELECT pg_advisory_xact_lock(:chave)'), {'chave': EVENTOS_HISTORICO_LOCK})
+            if db.session.query(Evento.id).first() is not None:
+                db.session.rollback()
+                return
+        registros = []
+        fornecedores = db.session.query(
+            Fornecedor.id, Fornecedor.nome, Fornecedor.email, Fornecedor.cnpj, Fornecedor.data_cadastro
+        ).filter(Fornecedor.data_cadastro.isnot(None))
+        for fornecedor_id, nome, email, cnpj, data_cadastro in fornecedores:
+            registros.append({
+                'tipo': 'cadastro',
+                'referencia': f'cadastro-{fornecedor_id}',
+                'fornecedor_id': fornecedor_id,
+                'titulo': 'Novo fornecedor cadastrado',
+                'descricao': (nome or '')[:255],
+                'detalhes': {'email': email, 'cnpj': cnpj},
+                'criado_em': data_cadastro,
+            })
+        documentos = db.session.query(
+            Documento.id, Documento.nome_documento, Documento.categoria, Documento.data_upload,
+            Fornecedor.id, Fornecedor.nome
+        ).join(Fornecedor, Documento.fornecedor_id == Fornecedor.id).filter(Documento.data_upload.isnot(None))
+        for documento_id, nome_documento, categoria, data_upload, fornecedor_id, nome in documentos:
+            registros.append({
+                'tipo': 'documento',
+                'referencia': f'documento-{documento_id}',
+                'fornecedor_id': fornecedor_id,
+                'titulo': 'Documento enviado',
+                'descricao': f"{nome} anexou {nome_documento}"[:255],
+                'detalhes': {'fornecedor': nome, 'documento': nome_documento, 'categoria': categoria},
+                'criado_em': data_upload,
+            })
+        if not registros:
+            return
+        registros.sort(key=lambda registro: registro['criado_em'])
+        eventos = Evento.__table__
+        colunas = list(registros[0])
+        ainda_nao_gravado = ~exists().where(
+            eventos.c.tipo == bindparam('tipo'),
+            eventos.c.referencia == bindparam('referencia'),
+        )
+        comando = eventos.insert().from_select(
+            colunas,
+            select(*[bindparam(nome, type_=eventos.c[nome].type) for nome in colunas]).where(ainda_nao_gravado),
+        )
+        gravados = db.session.execute(comando, registros).rowcount
+        db.session.commit()
+        if gravados:
+            print(f'{gravados} eventos gerados a partir do histórico.')
+    except Exception as exc:
+        db.session.rollback()
+        print(f'Erro ao gerar eventos a partir do histórico: {exc}')
+
+
 with app.app_context():
     db.create_all()
     _ensure_nota_fornecedor_schema()
     _ensure_documento_schema()
+    _ensure_colunas_atualizacao()
     _backfill_documento_conteudo()
+    _backfill_eventos()
 
     
 @app.after_request
@@ -519,7 +725,10 @@ def cadastrar_fornecedor():
     
     Recebe dados de cadastro (nome, CNPJ, e-mail e senha) e cria um novo
     fornecedor no banco de dados. A senha é criptografada antes de ser armazenada.
-    Valida se todos os campos obrigatórios foram fornecidos.
+    Valida se todos os campos obrigatórios foram fornecidos e se o e-mail (sem
+    diferenciar maiúsculas) e o CNPJ (só os dígitos, ignorando a pontuação)
+    ainda não estão cadastrados. O e-mail é gravado na forma canônica
+    (minúsculas, sem espaços nas bordas).
     
     Returns:
         JSON com mensagem de sucesso (201) ou erro (400/500)
@@ -529,15 +738,26 @@ def cadastrar_fornecedor():
         print(data)
         if not all(key in data for key in ('email', 'cnpj', 'nome', 'senha')):
             return jsonify(message="Dados incompletos, verifique os campos."), 400
+        email = _email_normalizado(data['email'])
+        if email is None:
+            return jsonify(message="Dados incompletos, verifique os campos."), 400
+        if Fornecedor.query.filter_by(email_normalizado=email).first():
+            return jsonify(message="E-mail já cadastrado."), 400
+        cnpj_digitos = _cnpj_digitos(data['cnpj'])
+        if cnpj_digitos and Fornecedor.query.filter_by(cnpj_digitos=cnpj_digitos).first():
+            return jsonify(message="CNPJ já cadastrado."), 400
         hashed_password = generate_password_hash(data['senha'], method='pbkdf2:sha256')
         fornecedor = Fornecedor(
             nome=data['nome'],
-            email=data['email'],
+            email=email,
             cnpj=data['cnpj'],
             senha=hashed_password
         )
         db.session.add(fornecedor)
+        db.session.flush()
+        _evento_cadastro(fornecedor)
         db.session.commit()
+        _atualizar_resumos_apos_escrita(fornecedor)
         return jsonify(message="Fornecedor cadastrado com sucesso"), 201
     except Exception as e:
         print(str(e))
@@ -564,13 +784,20 @@ def login():
             app.logger.error(f"Login falhou, email ou senha não fornecidos: {data}")
             return jsonify(message="Email e senha são obrigatórios."), 400
 
-        fornecedor = Fornecedor.query.filter(Fornecedor.email.ilike(email)).first()
-        if not fornecedor:
+        candidatos = (
+            Fornecedor.query.filter_by(email_normalizado=_email_normalizado(email))
+            .order_by(Fornecedor.id)
+            .all()
+        )
+        if not candidatos:
             app.logger.error(f"Fornecedor não encontrado: {email}")
             return jsonify(message="Credenciais inválidas"), 401
 
-        if not check_password_hash(fornecedor.senha, senha):
-            app.logger.error(f"Senha incorreta para o fornecedor: {fornecedor.email}")
+        # Mais de um candidato só em cadastros antigos de e-mail duplicado
+        # (ver _backfill_emails_normalizados): vale o que tiver a senha informada.
+        fornecedor = next((item for item in candidatos if check_password_hash(item.senha, senha)), None)
+        if fornecedor is None:
+            app.logger.error(f"Senha incorreta para o fornecedor: {candidatos[0].email}")
             return jsonify(message="Credenciais inválidas"), 401
 
         access_token = create_access_token(identity=str(fornecedor.id))
@@ -596,7 +823,11 @@ def recuperar_senha():
     """
     try:
         data = request.get_json()
-        fornecedor = Fornecedor.query.filter_by(email=data['email']).first()
+        fornecedor = (
+            Fornecedor.query.filter_by(email_normalizado=_email_normalizado(data['email']))
+            .order_by(Fornecedor.id)
+            .first()
+        )
         if not fornecedor:
             return jsonify(message="Fornecedor não encontrado"), 404
         token = str(random.randint(100000, 999999))
@@ -1071,6 +1302,99 @@ def _normalizar_texto(valor):
     return texto.upper().strip()
 
 
+@functools.lru_cache(maxsize=None)
+def _tabela_remocao_combinantes():
+    """
+    Tabela de str.translate que remove todos os caracteres combinantes Unicode.
+
+    Equivale ao filtro `not unicodedata.combining(ch)` de _normalizar_texto e é
+    montada uma única vez por processo, no primeiro uso.
+
+    Returns:
+        Dicionário {codepoint: None} para uso com str.translate
+    """
+    return {
+        codigo: None
+        for codigo in range(sys.maxunicode + 1)
+        if unicodedata.combining(chr(codigo))
+    }
+
+
+_SEPARADOR_BLOCO = '\x00'
+# Sequências de espaços em branco que não são um único ' ' (equivale a colapsar \s+ em ' ').
+_RE_ESPACOS = re.compile(r'[^\S ]\s*| \s+')
+_RE_NAO_ALFANUMERICO_BLOCO = re.compile(r'[^\w\s\x00]|_')
+
+
+def _textos_em_bloco(textos):
+    """
+    Junta textos num único bloco separado por NUL para normalização em lote.
+
+    Processar um único bloco com str/unicodedata/re roda as etapas de
+    normalização em C de uma só vez, em vez de uma chamada por célula. O NUL
+    não é letra, número, espaço nem caractere combinante, então as etapas não o
+    alteram nem deixam uma célula afetar a vizinha.
+
+    Args:
+        textos: Lista de strings
+
+    Returns:
+        Bloco de texto, ou None se algum texto já contiver o separador
+    """
+    bloco = _SEPARADOR_BLOCO.join(textos)
+    if bloco.count(_SEPARADOR_BLOCO) != len(textos) - 1:
+        return None
+    return bloco
+
+
+def _separar_bloco(bloco, serie):
+    """
+    Desfaz _textos_em_bloco, aplicando o strip final de cada célula.
+
+    Args:
+        bloco: Bloco já normalizado, com espaços consecutivos colapsados
+        serie: Série original (fornece o índice do resultado)
+
+    Returns:
+        Série de strings com o mesmo índice da série original
+    """
+    return pd.Series(
+        [texto.strip(' ') for texto in bloco.split(_SEPARADOR_BLOCO)],
+        index=serie.index,
+        dtype=object,
+    )
+
+
+def _normalizar_texto_series(serie):
+    """
+    Versão vetorizada de _normalizar_texto para séries do pandas.
+
+    Aplica as mesmas etapas (NFKD, remoção de combinantes, espaços e maiúsculas)
+    sobre a coluna inteira de uma vez, produzindo exatamente o mesmo resultado
+    que `serie.apply(_normalizar_texto)` sem percorrer os caracteres em Python.
+
+    Args:
+        serie: Série do pandas com valores de qualquer tipo
+
+    Returns:
+        Série de strings normalizadas, com o mesmo índice
+    """
+    if serie.empty:
+        return pd.Series([], index=serie.index, dtype=object)
+    valores = serie.astype(object)
+    nulos = valores.isna().tolist()
+    textos = [
+        '' if nulo else (valor if isinstance(valor, str) else str(valor))
+        for valor, nulo in zip(valores.tolist(), nulos)
+    ]
+    bloco = _textos_em_bloco(textos)
+    if bloco is None:
+        return pd.Series([_normalizar_texto(texto) for texto in textos], index=serie.index, dtype=object)
+    bloco = unicodedata.normalize('NFKD', bloco).translate(_tabela_remocao_combinantes())
+    bloco = _RE_ESPACOS.sub(' ', bloco).upper()
+    return _separar_bloco(bloco, serie)
+
+
 def _normalizar_chave(valor):
     """
     Cria uma chave normalizada a partir de um valor, removendo tudo exceto alfanuméricos.
@@ -1184,6 +1508,335 @@ CLAF_VALORES_IGNORADOS = {
 }
 
 
+CLAF_CANDIDATOS_MATERIAL = ('material', 'materiais', 'material/servico', 'categoria', 'grupo', 'familia')
+CLAF_CANDIDATOS_DOCUMENTOS = (
+    'requisitos legais',
+    'requisitos_estabelecidos_pela_engeman',
+    'requisitos estabelecidos pela engeman',
+    'criterios de qualificacao',
+)
+
+
+def _assinatura_arquivos(caminhos):
+    """
+    Calcula a assinatura (caminho, mtime, tamanho) de um conjunto de arquivos.
+
+    Usada pelos caches de planilhas para detectar quando um arquivo foi
+    substituído ou editado sem precisar reabri-lo.
+
+    Args:
+        caminhos: Lista de caminhos absolutos
+
+    Returns:
+        Tupla imutável com (caminho, mtime_ns, tamanho) de cada arquivo
+    """
+    assinatura = []
+    for caminho in caminhos:
+        info = os.stat(caminho)
+        assinatura.append((caminho, info.st_mtime_ns, info.st_size))
+    return tuple(assinatura)
+
+
+class _SnapshotArquivo:
+    """
+    Cache em memória de um objeto derivado de arquivos em disco.
+
+    O objeto é construído uma vez por worker e reaproveitado entre requisições.
+    A assinatura (mtime/tamanho) dos arquivos é conferida no máximo a cada
+    PLANILHAS_INTERVALO_VERIFICACAO segundos; quando muda, a nova versão é
+    construída numa thread em segundo plano (incluindo os índices derivados,
+    via `aquecer`) enquanto as requisições continuam recebendo a versão atual.
+    Valor e assinatura ficam numa única tupla para que a troca seja atômica, e
+    se a nova versão falhar a última versão válida continua sendo servida.
+    Depois de cada recarga em segundo plano, `ao_recarregar` (se informado) é
+    chamado na mesma thread com o novo valor.
+    """
+
+    def __init__(self, nome, localizar, construir, aquecer=None, ao_recarregar=None):
+        self.nome = nome
+        self._localizar = localizar
+        self._construir = construir
+        self._aquecer = aquecer
+        self._ao_recarregar = ao_recarregar
+        self._lock = threading.Lock()
+        self._estado = (None, None)
+        self._proxima_verificacao = 0.0
+        self._recarregando = False
+        self._assinatura_falha = None
+
+    def _intervalo_verificacao(self):
+        try:
+            return float(app.config.get('PLANILHAS_INTERVALO_VERIFICACAO', 5))
+        except (TypeError, ValueError):
+            return 5.0
+
+    def _construir_valor(self, caminhos):
+        valor = self._construir(caminhos)
+        if self._aquecer is not None:
+            self._aquecer(valor)
+        return valor
+
+    def _carregar(self, caminhos, assinatura):
+        estado = (assinatura, self._construir_valor(caminhos))
+        self._estado = estado
+        self._assinatura_falha = None
+        print(f'Snapshot {self.nome} carregado a partir de {", ".join(caminhos)}')
+        return estado
+
+    def _recarregar_em_segundo_plano(self, caminhos, assinatura):
+        estado = None
+        try:
+            with self._lock:
+                if self._estado[0] != assinatura:
+                    estado = self._carregar(caminhos, assinatura)
+        except Exception as exc:
+            self._assinatura_falha = assinatura
+            print(f'Erro ao recarregar snapshot {self.nome}; mantendo a versão anterior: {exc}')
+        finally:
+            self._recarregando = False
+        if estado is not None and self._ao_recarregar is not None:
+            try:
+                self._ao_recarregar(estado[1])
+            except Exception as exc:
+                print(f'Erro ao processar recarga do snapshot {self.nome}: {exc}')
+
+    def obter(self, sincrono=False):
+        """
+        Retorna o objeto em cache, agendando a reconstrução se os arquivos mudaram.
+
+        Args:
+            sincrono: Ver obter_estado
+
+        Raises:
+            FileNotFoundError: Se os arquivos de origem não forem encontrados e
+                ainda não houver versão carregada
+        """
+        return self.obter_estado(sincrono)[1]
+
+    def obter_estado(self, sincrono=False):
+        """
+        Retorna a tupla (assinatura, objeto) em cache, agendando a reconstrução se os arquivos mudaram.
+
+        Só a primeira carga (quando ainda não há versão válida) é feita na própria
+        requisição; depois disso as novas versões são construídas em segundo plano.
+
+        Args:
+            sincrono: Se True, confere os arquivos agora e aguarda a reconstrução
+                (usado por rotinas administrativas que precisam da versão em disco)
+
+        Raises:
+            FileNotFoundError: Se os arquivos de origem não forem encontrados e
+                ainda não houver versão carregada
+        """
+        estado = self._estado
+        assinatura_atual, valor = estado
+        agora = time.monotonic()
+        if valor is not None and not sincrono and agora < self._proxima_verificacao:
+            return estado
+        self._proxima_verificacao = agora + self._intervalo_verificacao()
+        try:
+            caminhos = self._localizar()
+            assinatura = _assinatura_arquivos(caminhos)
+        except FileNotFoundError:
+            if valor is not None and not sincrono:
+                return estado
+            raise
+        if valor is not None and assinatura_atual == assinatura:
+            return estado
+        if valor is None or sincrono:
+            with self._lock:
+                estado = self._estado
+                if estado[1] is not None and estado[0] == assinatura:
+                    return estado
+                return self._carregar(caminhos, assinatura)
+        if not self._recarregando and assinatura != self._assinatura_falha:
+            self._recarregando = True
+            threading.Thread(
+                target=self._recarregar_em_segundo_plano,
+                args=(caminhos, assinatura),
+                name=f'snapshot-{self.nome}',
+                daemon=True,
+            ).start()
+        return estado
+
+    def carregar_em_segundo_plano(self):
+        """
+        Faz a primeira carga numa thread, para que a primeira requisição não pague a leitura.
+        """
+        def carregar():
+            try:
+                self.obter()
+            except FileNotFoundError:
+                pass
+            except Exception as exc:
+                print(f'Erro ao carregar snapshot {self.nome}: {exc}')
+
+        threading.Thread(target=carregar, name=f'snapshot-{self.nome}', daemon=True).start()
+
+
+class _IndiceDocumentosClaf:
+    """
+    Índice invertido categoria normalizada -> documentos exigidos na CLAF.
+
+    Cada linha da planilha é normalizada uma única vez na construção. A resposta
+    para cada categoria conhecida já fica pronta (incluindo a correspondência
+    "contém / está contida em" entre categorias), e categorias desconhecidas
+    são resolvidas comparando apenas as chaves distintas, não as linhas.
+    """
+
+    LIMITE_MEMO = 256
+
+    def __init__(self, df, coluna_material, colunas_documentos):
+        self._documentos_por_linha = []
+        self._linhas_por_chave = {}
+        valores_material = df[coluna_material].tolist() if coluna_material is not None else [None] * len(df)
+        valores_documentos = [df[coluna].tolist() for coluna in colunas_documentos]
+        for indice, valor_material in enumerate(valores_material):
+            documentos_linha = []
+            for valores_coluna in valores_documentos:
+                valor = valores_coluna[indice]
+                if pd.isna(valor):
+                    continue
+                texto = str(valor).strip()
+                if not texto:
+                    continue
+                texto_normalizado = _normalizar_texto(texto)
+                if not texto_normalizado or texto_normalizado in CLAF_VALORES_IGNORADOS:
+                    continue
+                documentos_linha.append((texto, texto_normalizado))
+            self._documentos_por_linha.append(documentos_linha)
+            chave = _normalizar_texto(valor_material)
+            if chave:
+                self._linhas_por_chave.setdefault(chave, []).append(indice)
+        self._chaves = tuple(self._linhas_por_chave)
+        self._memo_lock = threading.Lock()
+        self._memo = {}
+        self.documentos_por_categoria = {
+            chave: self._resolver(chave) for chave in self._chaves
+        }
+
+    def _resolver(self, categoria_normalizada):
+        linhas = set()
+        for chave in self._chaves:
+            if categoria_normalizada in chave or chave in categoria_normalizada:
+                linhas.update(self._linhas_por_chave[chave])
+        documentos = []
+        vistos = set()
+        for indice in sorted(linhas):
+            for texto, texto_normalizado in self._documentos_por_linha[indice]:
+                if texto_normalizado in vistos:
+                    continue
+                vistos.add(texto_normalizado)
+                documentos.append(texto)
+        return documentos
+
+    def documentos(self, categoria_normalizada):
+        """
+        Retorna os documentos exigidos para uma categoria já normalizada.
+
+        Args:
+            categoria_normalizada: Categoria normalizada com _normalizar_texto
+
+        Returns:
+            Lista de documentos sem duplicatas, na ordem da planilha
+        """
+        documentos = self.documentos_por_categoria.get(categoria_normalizada)
+        if documentos is not None:
+            return list(documentos)
+        documentos = self._memo.get(categoria_normalizada)
+        if documentos is None:
+            documentos = self._resolver(categoria_normalizada)
+            with self._memo_lock:
+                if len(self._memo) >= self.LIMITE_MEMO:
+                    self._memo.pop(next(iter(self._memo)))
+                self._memo[categoria_normalizada] = documentos
+        return list(documentos)
+
+
+class _SnapshotClaf:
+    """
+    Estado pré-processado da planilha CLAF.
+
+    Guarda o DataFrame lido, as colunas escolhidas para materiais e documentos,
+    a lista de categorias já filtrada e ordenada e o índice de documentos por
+    categoria, evitando reler e reanalisar a planilha a cada requisição.
+    """
+
+    def __init__(self, df, coluna_material, colunas_documentos, categorias):
+        self.df = df
+        self.coluna_material = coluna_material
+        self.colunas_documentos = colunas_documentos
+        self.categorias = categorias
+        self.indice_documentos = _IndiceDocumentosClaf(df, coluna_material, colunas_documentos)
+
+
+def _listar_categorias_claf(serie):
+    """
+    Extrai as categorias únicas de uma coluna da planilha CLAF.
+
+    Remove valores vazios, genéricos (CLAF_VALORES_IGNORADOS) e duplicados
+    após normalização, e ordena o resultado pelo texto normalizado.
+
+    Args:
+        serie: Série do pandas com a coluna de materiais
+
+    Returns:
+        Lista de nomes de categorias
+    """
+    vistos = set()
+    materiais = []
+    for valor in serie:
+        if pd.isna(valor):
+            continue
+        nome = str(valor).strip()
+        if not nome:
+            continue
+        chave = _normalizar_texto(nome)
+        if not chave or chave in CLAF_VALORES_IGNORADOS:
+            continue
+        if chave in vistos:
+            continue
+        vistos.add(chave)
+        materiais.append(nome)
+    materiais.sort(key=_normalizar_texto)
+    return materiais
+
+
+def _construir_snapshot_claf(caminhos):
+    """
+    Lê a planilha CLAF e monta o snapshot com colunas e categorias resolvidas.
+
+    Args:
+        caminhos: Lista com o caminho da planilha CLAF
+
+    Returns:
+        Objeto _SnapshotClaf
+    """
+    df = pd.read_excel(caminhos[0], header=0)
+    df.columns = [str(col).strip() for col in df.columns]
+    coluna_material_lista = _colunas_por_candidatos(
+        df,
+        CLAF_CANDIDATOS_MATERIAL,
+        fallback_indices=[0],
+        max_count=1,
+    )
+    coluna_material = coluna_material_lista[0] if coluna_material_lista else None
+    colunas_documentos = _colunas_por_candidatos(
+        df,
+        CLAF_CANDIDATOS_DOCUMENTOS,
+        fallback_indices=[1, 2],
+    )
+    categorias = _listar_categorias_claf(df[coluna_material]) if coluna_material is not None else []
+    return _SnapshotClaf(df, coluna_material, colunas_documentos, categorias)
+
+
+_SNAPSHOT_CLAF = _SnapshotArquivo(
+    'CLAF',
+    lambda: [_obter_caminho_claf()],
+    _construir_snapshot_claf,
+)
+
+
 @app.route('/api/envio-documento', methods=['POST', 'OPTIONS'])
 def enviar_documento():
     """
@@ -1247,9 +1900,12 @@ def enviar_documento():
                 dados_arquivo=conteudo_bytes
             )
             db.session.add(documento)
+            db.session.flush()
+            _evento_documento(documento, fornecedor)
             lista_arquivos.append(filename)
             arquivos_paths.append(caminho_arquivo)
         db.session.commit()
+        _atualizar_resumos_apos_escrita(fornecedor)
         link_documentos = [f"/uploads/{fornecedor_id}/{a}" for a in lista_arquivos]
         enviar_email_documento(
             fornecedor_nome=fornecedor.nome,
@@ -1282,55 +1938,13 @@ def documentos_necessarios():
         categoria = (data.get('categoria') or '').strip()
         if not categoria:
             return jsonify(message="Categoria não fornecida"), 400
-        claf_path = _obter_caminho_claf()
-        df = pd.read_excel(claf_path, header=0)
-        df.columns = [str(col).strip() for col in df.columns]
-        coluna_material_lista = _colunas_por_candidatos(
-            df,
-            ('material', 'materiais', 'material/servico', 'categoria', 'grupo', 'familia'),
-            fallback_indices=[0],
-            max_count=1,
-        )
-        if not coluna_material_lista:
+        snapshot = _SNAPSHOT_CLAF.obter()
+        if snapshot.coluna_material is None:
             return jsonify(message="Coluna de materiais nao encontrada na planilha"), 500
-        coluna_material = coluna_material_lista[0]
-        colunas_documentos = _colunas_por_candidatos(
-            df,
-            (
-                'requisitos legais',
-                'requisitos_estabelecidos_pela_engeman',
-                'requisitos estabelecidos pela engeman',
-                'criterios de qualificacao',
-            ),
-            fallback_indices=[1, 2],
-        )
-        if not colunas_documentos:
+        if not snapshot.colunas_documentos:
             return jsonify(message="Colunas de documentos nao encontradas na planilha"), 500
         categoria_normalizada = _normalizar_texto(categoria)
-        serie_categorias = df[coluna_material].apply(_normalizar_texto)
-        mask = serie_categorias.apply(
-            lambda valor: bool(valor) and (
-                categoria_normalizada in valor or valor in categoria_normalizada
-            )
-        )
-        df_filtrado = df[mask]
-        documentos = []
-        vistos = set()
-        for _, row in df_filtrado.iterrows():
-            for coluna_doc in colunas_documentos:
-                valor = row.get(coluna_doc)
-                if pd.isna(valor):
-                    continue
-                texto = str(valor).strip()
-                if not texto:
-                    continue
-                texto_normalizado = _normalizar_texto(texto)
-                if not texto_normalizado or texto_normalizado in CLAF_VALORES_IGNORADOS:
-                    continue
-                if texto_normalizado in vistos:
-                    continue
-                vistos.add(texto_normalizado)
-                documentos.append(texto)
+        documentos = snapshot.indice_documentos.documentos(categoria_normalizada)
         return jsonify(documentos=documentos), 200
     except FileNotFoundError as exc:
         return jsonify(message=str(exc)), 500
@@ -1349,35 +1963,10 @@ def listar_categorias():
         JSON com lista de categorias e total (200) ou erro (500)
     """
     try:
-        claf_path = _obter_caminho_claf()
-        df = pd.read_excel(claf_path, header=0)
-        df.columns = [str(col).strip() for col in df.columns]
-        coluna_material_lista = _colunas_por_candidatos(
-            df,
-            ('material', 'materiais', 'material/servico', 'categoria', 'grupo', 'familia'),
-            fallback_indices=[0],
-            max_count=1,
-        )
-        if not coluna_material_lista:
+        snapshot = _SNAPSHOT_CLAF.obter()
+        if snapshot.coluna_material is None:
             return jsonify(message="Coluna de materiais nao encontrada na planilha"), 500
-        coluna_material = coluna_material_lista[0]
-        serie = df[coluna_material]
-        vistos = set()
-        materiais = []
-        for valor in serie:
-            if pd.isna(valor):
-                continue
-            nome = str(valor).strip()
-            if not nome:
-                continue
-            chave = _normalizar_texto(nome)
-            if not chave or chave in CLAF_VALORES_IGNORADOS:
-                continue
-            if chave in vistos:
-                continue
-            vistos.add(chave)
-            materiais.append(nome)
-        materiais.sort(key=_normalizar_texto)
+        materiais = list(snapshot.categorias)
         return jsonify(materiais=materiais, total=len(materiais)), 200
     except FileNotFoundError as exc:
         return jsonify(message=str(exc)), 500
@@ -1407,99 +1996,55 @@ def consultar_dados_homologacao():
         if not fornecedor_nome:
 
             return jsonify(message="Parâmetro 'fornecedor_nome' é obrigatório."), 400
-        
-        path_homologados = os.path.abspath(
-            os.path.join(app.root_path, '..', 'uploads', 'fornecedores_homologados.xlsx')
-        )
-        path_controle = os.path.abspath(
-            os.path.join(app.root_path, '..', 'uploads', 'atendimento controle_qualidade.xlsx')
-        )
-        print(f"Caminho do arquivo de homologados: {path_homologados}")
-
-        print(f"Caminho do arquivo de controle de qualidade: {path_controle}")
 
-        if not os.path.exists(path_homologados) or not os.path.exists(path_controle):
+        df_homologacao, controle_qualidade = _carregar_planilhas_homologacao()
+        if not _planilhas_no_banco() and (df_homologacao is None or controle_qualidade is None):
             return jsonify(
                 message="Um ou mais arquivos de planilha não foram encontrados. Verifique os caminhos dos arquivos."
             ), 500
-        df_homologacao = pd.read_excel(path_homologados)
-
-        df_controle_qualidade = pd.read_excel(path_controle)
-
-        df_homologacao.columns = (
-            df_homologacao.columns.str.strip().str.lower().str.replace(" ", "_")
-        )
-
-        df_controle_qualidade.columns = (
-            df_controle_qualidade.columns.str.strip().str.lower().str.replace(" ", "_")
-        )
-        filtro_homologados = df_homologacao[
-            df_homologacao['agente'].str.contains(fornecedor_nome, case=False, na=False)
-        ]
-        if filtro_homologados.empty:
+        fornecedor_h = _buscar_homologado_por_termo(fornecedor_nome, df_homologacao)
+        if fornecedor_h is None:
             return jsonify(message="Fornecedor não encontrado na planilha de homologados."), 404
         
-        fornecedor_h = filtro_homologados.iloc[0]
-
         print(f"Fornecedor encontrado: {fornecedor_h}")
 
         fornecedor_id_raw = fornecedor_h.get('codigo')
         fornecedor_id = int(fornecedor_id_raw) if pd.notna(fornecedor_id_raw) else None
         nota_homologacao_raw = fornecedor_h.get('nota_homologacao')
-        nota_homologacao = float(nota_homologacao_raw) if nota_homologacao_raw is not None and not pd.isna(nota_homologacao_raw) else None
+        nota_homologacao = _to_float(nota_homologacao_raw)
         iqf_raw = fornecedor_h.get('iqf')
-        iqf = float(iqf_raw) if iqf_raw is not None and not pd.isna(iqf_raw) else None
+        iqf = _to_float(iqf_raw)
         aprovado_raw = fornecedor_h.get('aprovado')
         aprovado_valor = ''
 
         if aprovado_raw is not None and not pd.isna(aprovado_raw):
 
             aprovado_valor = str(aprovado_raw).strip()
-        status_homologacao = 'APROVADO' if aprovado_valor.upper() == 'S' else 'EM_ANALISE'
-        filtro_ocorrencias = df_controle_qualidade[
-            df_controle_qualidade['nome_agente'].str.strip().str.lower()
-            == fornecedor_h['agente'].strip().lower()
-        ] if 'nome_agente' in df_controle_qualidade.columns else df_controle_qualidade.iloc[0:0]
-
-        if filtro_ocorrencias.empty and 'nome_agente' in df_controle_qualidade.columns and fornecedor_nome:
-            filtro_ocorrencias = df_controle_qualidade[
-                df_controle_qualidade['nome_agente'].str.contains(fornecedor_nome, case=False, na=False)
-            ]
-        media_iqf_controle = None
-        total_notas_controle = 0
-        if not filtro_ocorrencias.empty and 'nota' in filtro_ocorrencias.columns:
-            notas_validas = pd.to_numeric(filtro_ocorrencias['nota'], errors='coerce').dropna()
-            total_notas_controle = len(notas_validas)
-            if total_notas_controle:
-                media_iqf_controle = float(notas_validas.mean())
-                print(f"Total de notas encontradas no controle de qualidade: {total_notas_controle}")
-                print(f"IQF calculada a partir do controle de qualidade: {media_iqf_controle}")
+        media_iqf_controle, total_notas_controle, observacoes_controle = _agregados_controle_por_termo(
+            fornecedor_h.get('agente'), fornecedor_nome, controle_qualidade
+        )
+        if total_notas_controle:
+            print(f"Total de notas encontradas no controle de qualidade: {total_notas_controle}")
+            print(f"IQF calculada a partir do controle de qualidade: {media_iqf_controle}")
         observacoes_lista = []
         observacao_resumo = ''
-        if 'observacao' in filtro_ocorrencias.columns:
-            observacoes_series = (
-                filtro_ocorrencias['observacao']
-                .fillna('')
-                .astype(str)
-                .str.strip()
+        observacoes_filtradas = []
+        for obs in observacoes_controle:
+            obs_limpo = obs.strip()
+            if not obs_limpo:
+                continue
+            obs_normalizado = ''.join(
+                ch for ch in unicodedata.normalize('NFD', obs_limpo.lower())
+                if unicodedata.category(ch) != 'Mn'
             )
-            observacoes_filtradas = []
-            for obs in observacoes_series.tolist():
-                obs_limpo = obs.strip()
-                if not obs_limpo:
-                    continue
-                obs_normalizado = ''.join(
-                    ch for ch in unicodedata.normalize('NFD', obs_limpo.lower())
-                    if unicodedata.category(ch) != 'Mn'
-                )
-                obs_normalizado = ''.join(ch for ch in obs_normalizado if ch.isalnum() or ch.isspace())
-                obs_normalizado = ' '.join(obs_normalizado.split())
-                if obs_normalizado == 'sem comentarios':
-                    continue
-                observacoes_filtradas.append(obs_limpo)
-            observacoes_lista = observacoes_filtradas
-            if observacoes_filtradas:
-                observacao_resumo = '; '.join(observacoes_filtradas)
+            obs_normalizado = ''.join(ch for ch in obs_normalizado if ch.isalnum() or ch.isspace())
+            obs_normalizado = ' '.join(obs_normalizado.split())
+            if obs_normalizado == 'sem comentarios':
+                continue
+            observacoes_filtradas.append(obs_limpo)
+        observacoes_lista = observacoes_filtradas
+        if observacoes_filtradas:
+            observacao_resumo = '; '.join(observacoes_filtradas)
         iqf_final = media_iqf_controle if media_iqf_controle is not None else iqf
         status_homologacao = _determinar_status_final(aprovado_valor, nota_homologacao, iqf_final, iqf)
         return jsonify(
@@ -1521,36 +2066,99 @@ def consultar_dados_homologacao():
         return jsonify(message="Erro ao consultar dados de homologação", error_details=str(e)), 500
 
 
-@app.route('/api/portal/resumo', methods=['GET'])
-@jwt_required()
-def portal_resumo():
+class _CacheResumoPortal:
     """
-    Endpoint que retorna resumo completo do fornecedor autenticado.
-    
-    Retorna um resumo consolidado com todas as informações relevantes do fornecedor:
-    status de homologação, notas IQF, observações, documentos enviados, etc.
-    Requer autenticação JWT válida.
-    
-    Returns:
-        JSON com objeto resumo completo (200) ou erro (400/404/500)
+    Cache LRU dos resumos do portal, uma entrada por fornecedor.
+
+    Cada entrada guarda a chave com que foi calculada (versão das planilhas e
+    marca de alteração do fornecedor); uma leitura só é aproveitada se a chave
+    atual for igual. As escritas do próprio processo removem a entrada na hora
+    (invalidar), e a chave cobre as feitas por outros workers.
     """
-    identidade = get_jwt_identity()
-    try:
-        fornecedor_id = int(identidade)
-    except (TypeError, ValueError):
-        return jsonify(message="Identidade do fornecedor inválida."), 400
+
+    def __init__(self, tamanho_maximo):
+        self._tamanho_maximo = max(int(tamanho_maximo), 1)
+        self._entradas = OrderedDict()
+        self._trava = threading.Lock()
+
+    def obter(self, fornecedor_id, chave):
+        with self._trava:
+            entrada = self._entradas.get(fornecedor_id)
+            if entrada is None or entrada[0] != chave:
+                return None
+            self._entradas.move_to_end(fornecedor_id)
+            return entrada[1]
+
+    def guardar(self, fornecedor_id, chave, resumo):
+        with self._trava:
+            self._entradas[fornecedor_id] = (chave, resumo)
+            self._entradas.move_to_end(fornecedor_id)
+            while len(self._entradas) > self._tamanho_maximo:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, fornecedor_id):
+        with self._trava:
+            self._entradas.pop(fornecedor_id, None)
+
+
+_CACHE_RESUMO_PORTAL = _CacheResumoPortal(app.config.get('PORTAL_RESUMO_CACHE_TAMANHO', 2048))
+
+
+def _marca_alteracao_fornecedor(fornecedor):
+    """
+    Marca da última alteração dos dados de um fornecedor usados no resumo.
+
+    Combina o atualizado_em do fornecedor e da nota/decisão com o último
+    atualizado_em e a quantidade de documentos, numa única consulta indexada.
+
+    Args:
+        fornecedor: Objeto Fornecedor
+
+    Returns:
+        Tupla comparável que muda a cada alteração do fornecedor
+    """
+    nota_em = select(NotaFornecedor.atualizado_em).where(
+        NotaFornecedor.fornecedor_id == fornecedor.id
+    ).scalar_subquery()
+    documento_em = select(func.max(Documento.atualizado_em)).where(
+        Documento.fornecedor_id == fornecedor.id
+    ).scalar_subquery()
+    total_documentos = select(func.count(Documento.id)).where(
+        Documento.fornecedor_id == fornecedor.id
+    ).scalar_subquery()
+    nota, documento, total = db.session.query(nota_em, documento_em, total_documentos).one()
+    return (fornecedor.atualizado_em, nota, documento, total)
+
+
+@app.route('/api/portal/resumo', methods=['GET'])
+@jwt_required()
+def portal_resumo():
+    """
+    Endpoint que retorna resumo completo do fornecedor autenticado.
+    
+    Retorna um resumo consolidado com todas as informações relevantes do fornecedor:
+    status de homologação, notas IQF, observações, documentos enviados, etc.
+    O resumo fica em cache (_CACHE_RESUMO_PORTAL) enquanto a versão das
+    planilhas e a marca de alteração do fornecedor não mudarem.
+    Requer autenticação JWT válida.
+    
+    Returns:
+        JSON com objeto resumo completo (200) ou erro (400/404/500)
+    """
+    identidade = get_jwt_identity()
+    try:
+        fornecedor_id = int(identidade)
+    except (TypeError, ValueError):
+        return jsonify(message="Identidade do fornecedor inválida."), 400
     fornecedor = Fornecedor.query.get(fornecedor_id)
     if fornecedor is None:
         return jsonify(message="Fornecedor não encontrado."), 404
-    df_homologados = None
-    df_controle = None
-    try:
-        df_homologados, df_controle = _carregar_planilhas_homologacao()
-    except FileNotFoundError as exc:
-        print(f'Planilhas de homologação não encontradas para resumo do portal: {exc}')
-    except Exception as exc:
-        print(f'Erro ao carregar planilhas para resumo do portal: {exc}')
-    resumo = _montar_resumo_portal(fornecedor, df_homologados, df_controle)
+    versao, df_homologados, controle_qualidade = _carregar_planilhas_homologacao_versionadas()
+    chave = (versao, _marca_alteracao_fornecedor(fornecedor))
+    resumo = _CACHE_RESUMO_PORTAL.obter(fornecedor.id, chave)
+    if resumo is None:
+        resumo = _montar_resumo_portal(fornecedor, df_homologados, controle_qualidade)
+        _CACHE_RESUMO_PORTAL.guardar(fornecedor.id, chave, resumo)
     return jsonify(resumo=resumo), 200
 
 def _normalize_text(value):
@@ -1576,35 +2184,886 @@ def _normalize_text(value):
     normalized = ''.join(ch for ch in normalized if ch.isalnum() or ch.isspace())
     return ' '.join(normalized.split())
 
+def _normalize_text_series(serie):
+    """
+    Versão vetorizada de _normalize_text para séries do pandas.
+
+    Normaliza a coluna inteira num único bloco de texto com expressões regulares
+    pré-compiladas, em vez de decompor cada caractere em Python. O resultado é
+    idêntico ao de `serie.apply(_normalize_text)`: os caracteres de marcação (Mn)
+    removidos pela versão escalar também são descartados pelo filtro de
+    alfanuméricos.
+
+    Args:
+        serie: Série do pandas com valores de qualquer tipo
+
+    Returns:
+        Série de strings normalizadas, com o mesmo índice
+    """
+    if serie.empty:
+        return pd.Series([], index=serie.index, dtype=object)
+    textos = [
+        '' if valor is None else (valor if isinstance(valor, str) else str(valor))
+        for valor in serie.astype(object).tolist()
+    ]
+    bloco = _textos_em_bloco(textos)
+    if bloco is None:
+        return pd.Series([_normalize_text(texto) for texto in textos], index=serie.index, dtype=object)
+    bloco = unicodedata.normalize('NFD', bloco.lower())
+    bloco = _RE_NAO_ALFANUMERICO_BLOCO.sub('', bloco)
+    bloco = _RE_ESPACOS.sub(' ', bloco)
+    return _separar_bloco(bloco, serie)
+
+
+
+BUSCA_FORNECEDORES_TABELA_FTS = 'fornecedores_busca'
+BUSCA_FORNECEDORES_TAMANHO_MINIMO = 3
+_BUSCA_FORNECEDORES = {'modo': 'like'}
+_TABELA_BUSCA_FTS = table(BUSCA_FORNECEDORES_TABELA_FTS, column('rowid'))
+
+
+def _cnpj_digitos(valor):
+    """
+    Chave de comparação de um CNPJ: apenas os dígitos.
+
+    CNPJs lidos como número de planilhas perdem os zeros à esquerda; nesse caso
+    o valor é completado até 14 dígitos.
+
+    Args:
+        valor: CNPJ como texto (com ou sem pontuação) ou número
+
+    Returns:
+        String só com dígitos ou None se não houver nenhum
+    """
+    if valor is None:
+        return None
+    if isinstance(valor, (int, float, np.integer, np.floating)) and not isinstance(valor, bool):
+        if isinstance(valor, (float, np.floating)) and (math.isnan(valor) or not float(valor).is_integer()):
+            return None
+        return str(int(valor)).zfill(14)
+    digitos = ''.join(ch for ch in str(valor) if ch.isdigit())
+    return digitos or None
+
+
+def _email_normalizado(email):
+    """
+    Forma canônica de um e-mail: sem espaços nas bordas e em minúsculas.
+
+    Args:
+        email: E-mail como digitado
+
+    Returns:
+        E-mail normalizado ou None se vazio
+    """
+    if email is None:
+        return None
+    normalizado = str(email).strip().lower()
+    return normalizado or None
+
+
+@event.listens_for(Fornecedor, 'before_insert')
+@event.listens_for(Fornecedor, 'before_update')
+def _preencher_colunas_derivadas(mapper, connection, fornecedor):
+    """
+    Mantém as colunas derivadas de Fornecedor sincronizadas a cada gravação.
+
+    nome_busca guarda o nome normalizado por _normalize_text (busca sem
+    acentos) e cnpj_digitos o CNPJ só com dígitos (comparação por igualdade).
+    Quando o e-mail muda, ele é gravado na forma canônica de _email_normalizado
+    e copiado para email_normalizado, a chave única usada no login.
+    """
+    fornecedor.nome_busca = _normalize_text(fornecedor.nome)[:100]
+    fornecedor.cnpj_digitos = _cnpj_digitos(fornecedor.cnpj)
+    if inspect(fornecedor).attrs.email.history.has_changes():
+        fornecedor.email = _email_normalizado(fornecedor.email)
+        fornecedor.email_normalizado = fornecedor.email
+
+
+def _backfill_emails_normalizados():
+    """
+    Deixa email na forma canônica e preenche email_normalizado dos fornecedores antigos.
+
+    Cadastros antigos com o mesmo e-mail a menos de maiúsculas ou espaços não
+    são alterados nem bloqueados: todos recebem o mesmo email_normalizado
+    (o login confere a senha de cada um), mantêm o e-mail como foi digitado
+    (a coluna email é única) e os ids de cada grupo são registrados como erro
+    no log para revisão. Enquanto houver duplicados, o índice único de
+    email_normalizado não é criado (ver _ensure_fornecedor_colunas_derivadas).
+
+    Returns:
+        Tupla (quantidade de fornecedores atualizados, dicionário e-mail
+        canônico -> ids dos cadastros duplicados)
+    """
+    pendentes = (
+        Fornecedor.query.filter(
+            or_(
+                Fornecedor.email_normalizado.is_(None),
+                Fornecedor.email_normalizado != Fornecedor.email,
+            )
+        )
+        .order_by(Fornecedor.id)
+        .all()
+    )
+    if not pendentes:
+        return 0, {}
+    ids_por_email = {}
+    for fornecedor_id, email in db.session.query(Fornecedor.id, Fornecedor.email).order_by(Fornecedor.id):
+        email = _email_normalizado(email)
+        if email is not None:
+            ids_por_email.setdefault(email, []).append(fornecedor_id)
+    duplicados = {email: ids for email, ids in ids_por_email.items() if len(ids) > 1}
+    for email, ids in duplicados.items():
+        app.logger.error(
+            f'Fornecedores {", ".join(map(str, ids))} têm o mesmo e-mail ({email}); '
+            'corrija os cadastros para que o índice único de e-mail seja criado.'
+        )
+    atualizados = 0
+    for fornecedor in pendentes:
+        email = _email_normalizado(fornecedor.email)
+        if email not in duplicados and fornecedor.email != email:
+            fornecedor.email = email
+            atualizados += 1
+        if fornecedor.email_normalizado != email:
+            fornecedor.email_normalizado = email
+            atualizados += 1
+    return atualizados, duplicados
+
+
+def _ensure_fornecedor_colunas_derivadas():
+    """
+    Garante as colunas derivadas de fornecedores e planilha_homologados.
+
+    Adiciona nome_busca, cnpj_digitos e email_normalizado quando faltarem,
+    preenche os registros gravados antes das colunas existirem e só então
+    cria os índices (o de email_normalizado é único).
+
+    Com cadastros de e-mail duplicado, um índice comum substitui o único até
+    que os duplicados sejam corrigidos; a aplicação continua iniciando.
+    """
+    colunas_por_tabela = {
+        'fornecedores': (
+            ('nome_busca', 'VARCHAR(100)'),
+            ('cnpj_digitos', 'VARCHAR(14)'),
+            ('email_normalizado', 'VARCHAR(100)'),
+        ),
+        'planilha_homologados': (('cnpj_digitos', 'VARCHAR(14)'),),
+    }
+    try:
+        inspector = inspect(db.engine)
+        tabelas = set(inspector.get_table_names())
+        with db.engine.begin() as connection:
+            for tabela, colunas in colunas_por_tabela.items():
+                if tabela not in tabelas:
+                    continue
+                existentes = {col['name'] for col in inspector.get_columns(tabela)}
+                for nome_coluna, ddl in colunas:
+                    if nome_coluna not in existentes:
+                        connection.execute(text(f'ALTER TABLE {tabela} ADD COLUMN {nome_coluna} {ddl}'))
+                        print(f'Coluna {nome_coluna} adicionada a {tabela}')
+        pendentes = Fornecedor.query.filter(
+            or_(
+                Fornecedor.nome_busca.is_(None),
+                and_(Fornecedor.cnpj_digitos.is_(None), Fornecedor.cnpj.isnot(None))
+            )
+        ).all()
+        for fornecedor in pendentes:
+            fornecedor.nome_busca = _normalize_text(fornecedor.nome)[:100]
+            fornecedor.cnpj_digitos = _cnpj_digitos(fornecedor.cnpj)
+        emails, emails_duplicados = _backfill_emails_normalizados()
+        linhas_planilha = PlanilhaHomologado.query.filter(
+            PlanilhaHomologado.cnpj_digitos.is_(None),
+            PlanilhaHomologado.cnpj.isnot(None)
+        ).all()
+        for registro in linhas_planilha:
+            registro.cnpj_digitos = _cnpj_digitos(registro.cnpj)
+        if pendentes or emails or linhas_planilha:
+            db.session.commit()
+            print(
+                f'Colunas derivadas preenchidas para {len(pendentes)} fornecedores, '
+                f'{emails} e-mails e {len(linhas_planilha)} linhas da planilha.'
+            )
+        with db.engine.begin() as connection:
+            for tabela in colunas_por_tabela:
+                connection.execute(text(
+                    f'CREATE INDEX IF NOT EXISTS ix_{tabela}_cnpj_digitos ON {tabela} (cnpj_digitos)'
+                ))
+            if emails_duplicados:
+                connection.execute(text(
+                    'CREATE INDEX IF NOT EXISTS ix_fornecedores_email_normalizado_duplicado '
+                    'ON fornecedores (email_normalizado)'
+                ))
+            else:
+                connection.execute(text('DROP INDEX IF EXISTS ix_fornecedores_email_normalizado_duplicado'))
+                connection.execute(text(
+                    'CREATE UNIQUE INDEX IF NOT EXISTS ix_fornecedores_email_normalizado '
+                    'ON fornecedores (email_normalizado)'
+                ))
+    except Exception as exc:
+        db.session.rollback()
+        print(f'Erro ao ajustar colunas derivadas de fornecedores: {exc}')
+
+
+def _ensure_busca_fornecedores():
+    """
+    Prepara o índice de busca de fornecedores por nome e CNPJ.
+
+    Cria o índice próprio de cada banco sobre nome_busca e cnpj (ver
+    _ensure_fornecedor_colunas_derivadas):
+    - PostgreSQL: índices GIN com pg_trgm em nome_busca e cnpj
+    - SQLite: tabela FTS5 com tokenizer trigram, mantida por triggers
+    Se o índice não puder ser criado, a busca continua por LIKE.
+    """
+    dialect = db.engine.dialect.name
+    try:
+        if dialect == 'postgresql':
+            with db.engine.begin() as connection:
+                connection.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+                connection.execute(text(
+                    'CREATE INDEX IF NOT EXISTS ix_fornecedores_nome_busca_trgm '
+                    'ON fornecedores USING gin (nome_busca gin_trgm_ops)'
+                ))
+                connection.execute(text(
+                    'CREATE INDEX IF NOT EXISTS ix_fornecedores_cnpj_trgm '
+                    'ON fornecedores USING gin (cnpj gin_trgm_ops)'
+                ))
+            _BUSCA_FORNECEDORES['modo'] = 'trgm'
+        elif dialect == 'sqlite':
+            tabela = BUSCA_FORNECEDORES_TABELA_FTS
+            with db.engine.begin() as connection:
+                existe = connection.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nome"),
+                    {'nome': tabela}
+                ).first()
+                connection.execute(text(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {tabela} USING fts5("
+                    "nome_busca, cnpj, content='fornecedores', content_rowid='id', tokenize='trigram')"
+                ))
+                connection.execute(text(
+                    f"CREATE TRIGGER IF NOT EXISTS {tabela}_ai AFTER INSERT ON fornecedores BEGIN "
+                    f"INSERT INTO {tabela}(rowid, nome_busca, cnpj) VALUES (new.id, new.nome_busca, new.cnpj); END"
+                ))
+                connection.execute(text(
+                    f"CREATE TRIGGER IF NOT EXISTS {tabela}_ad AFTER DELETE ON fornecedores BEGIN "
+                    f"INSERT INTO {tabela}({tabela}, rowid, nome_busca, cnpj) "
+                    f"VALUES ('delete', old.id, old.nome_busca, old.cnpj); END"
+                ))
+                connection.execute(text(
+                    f"CREATE TRIGGER IF NOT EXISTS {tabela}_au AFTER UPDATE ON fornecedores BEGIN "
+                    f"INSERT INTO {tabela}({tabela}, rowid, nome_busca, cnpj) "
+                    f"VALUES ('delete', old.id, old.nome_busca, old.cnpj); "
+                    f"INSERT INTO {tabela}(rowid, nome_busca, cnpj) VALUES (new.id, new.nome_busca, new.cnpj); END"
+                ))
+                if not existe:
+                    connection.execute(text(f"INSERT INTO {tabela}({tabela}) VALUES ('rebuild')"))
+            _BUSCA_FORNECEDORES['modo'] = 'fts5'
+    except Exception as exc:
+        print(f'Índice de busca de fornecedores indisponível, usando LIKE: {exc}')
+        _BUSCA_FORNECEDORES['modo'] = 'like'
+        return
+    print(f"Busca de fornecedores usando {_BUSCA_FORNECEDORES['modo']}")
+
+
+def _frase_fts(termo):
+    """Escapa um termo como frase literal para a sintaxe de consulta do FTS5."""
+    return '"' + termo.replace('"', '""') + '"'
+
+
+def _filtrar_busca_fornecedores(query, termo):
+    """
+    Aplica a busca por nome ou CNPJ a uma query de Fornecedor.
+
+    O nome é comparado pela forma normalizada (sem acentos, minúsculas) e o
+    CNPJ pelo texto digitado. A consulta usa o índice do banco configurado em
+    _ensure_busca_fornecedores; termos curtos demais para trigramas, ou bancos
+    sem índice, usam LIKE.
+
+    Args:
+        query: Query de Fornecedor ou select() sobre colunas de Fornecedor
+        termo: Texto digitado pelo usuário
+
+    Returns:
+        Tupla (query filtrada, expressão de relevância) em que valores maiores
+        indicam resultados mais relevantes
+    """
+    termo = (termo or '').strip()
+    termo_nome = _normalize_text(termo)
+    modo = _BUSCA_FORNECEDORES['modo']
+    curto = len(termo_nome or termo) < BUSCA_FORNECEDORES_TAMANHO_MINIMO
+    if modo == 'fts5' and not curto:
+        colunas = [f'cnpj : {_frase_fts(termo)}']
+        if termo_nome:
+            colunas.insert(0, f'nome_busca : {_frase_fts(termo_nome)}')
+        tabela = literal_column(BUSCA_FORNECEDORES_TABELA_FTS)
+        query = query.join(_TABELA_BUSCA_FTS, _TABELA_BUSCA_FTS.c.rowid == Fornecedor.id).filter(
+            tabela.op('MATCH')(' OR '.join(colunas))
+        )
+        return query, -func.bm25(tabela)
+    filtros = [Fornecedor.cnpj.ilike(f'%{termo}%')]
+    if termo_nome:
+        filtros.insert(0, Fornecedor.nome_busca.like(f'%{termo_nome}%'))
+    query = query.filter(or_(*filtros))
+    if modo == 'trgm' and not curto and termo_nome:
+        return query, func.word_similarity(termo_nome, Fornecedor.nome_busca)
+    prefixo = Fornecedor.nome_busca.like(f'{termo_nome}%') if termo_nome else Fornecedor.cnpj.like(f'{termo}%')
+    return query, case((prefixo, 1.0), else_=0.0)
+
+
+PLANILHAS_HOMOLOGACAO = ('fornecedores_homologados.xlsx', 'atendimento controle_qualidade.xlsx')
+PLANILHA_SNAPSHOT_SUFIXO = '.snapshot.pkl'
+PLANILHA_SNAPSHOT_VERSAO = 5
+
+# Colunas usadas da planilha de homologados e o tipo com que são carregadas:
+# 'float64' para valores numéricos, 'category' para nomes repetidos e None para
+# texto mantido como lido. As demais colunas da planilha são descartadas.
+ESQUEMAS_PLANILHAS_HOMOLOGACAO = {
+    'fornecedores_homologados.xlsx': {
+        'codigo': 'float64',
+        'agente': 'category',
+        'nome_fantasia': None,
+        'cnpj': None,
+        'aprovado': 'category',
+        'nota_homologacao': 'float64',
+        'iqf': 'float64',
+    },
+}
+# A planilha de controle de qualidade não vira DataFrame: é lida em streaming e
+# agregada por agente (ver _agregar_controle_qualidade).
+COLUNAS_CONTROLE_QUALIDADE = ('nome_agente', 'nota', 'observacao')
+COLUNAS_OBRIGATORIAS_PLANILHAS = {
+    'fornecedores_homologados.xlsx': ('agente',),
+    'atendimento controle_qualidade.xlsx': ('nome_agente', 'nota'),
+}
+# Textos que o pandas trata como célula vazia por padrão ao ler planilhas.
+VALORES_VAZIOS_PLANILHA = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+    '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+})
+
+
+def _normalizar_colunas_planilha(df):
+    """
+    Normaliza os nomes das colunas de uma planilha de homologação.
+
+    Remove espaços nas bordas, converte para minúsculas e troca espaços por
+    underscores (ex.: 'Nome Agente' -> 'nome_agente').
+
+    Args:
+        df: DataFrame lido da planilha
+
+    Returns:
+        O próprio DataFrame com as colunas renomeadas
+    """
+    df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
+    return df
+
+
+def _nome_coluna_normalizado(coluna):
+    """
+    Normaliza um nome de coluna da mesma forma que _normalizar_colunas_planilha.
+
+    Args:
+        coluna: Nome da coluna como aparece no cabeçalho da planilha
+
+    Returns:
+        Nome normalizado (ex.: 'Nome Agente' -> 'nome_agente')
+    """
+    return str(coluna).strip().lower().replace(' ', '_')
+
+
+def _aplicar_esquema_planilha(df, nome_planilha):
+    """
+    Ajusta os tipos das colunas de uma planilha de homologação ao esquema declarado.
+
+    Colunas numéricas viram float64 (valores não numéricos viram NaN) e nomes de
+    agente viram categorias. A ausência de uma coluna esperada é registrada no
+    log: como erro quando a coluna é obrigatória, como aviso nos demais casos.
+
+    Args:
+        df: DataFrame com as colunas já normalizadas
+        nome_planilha: Nome do arquivo, chave de ESQUEMAS_PLANILHAS_HOMOLOGACAO
+
+    Returns:
+        O próprio DataFrame com os tipos ajustados
+    """
+    esquema = ESQUEMAS_PLANILHAS_HOMOLOGACAO[nome_planilha]
+    obrigatorias = COLUNAS_OBRIGATORIAS_PLANILHAS.get(nome_planilha, ())
+    for coluna, tipo in esquema.items():
+        if coluna not in df.columns:
+            if coluna in obrigatorias:
+                app.logger.error(f"Coluna obrigatória '{coluna}' ausente na planilha {nome_planilha}")
+            else:
+                app.logger.warning(f"Coluna '{coluna}' ausente na planilha {nome_planilha}")
+            continue
+        if tipo == 'float64':
+            df[coluna] = pd.to_numeric(df[coluna], errors='coerce').astype('float64')
+        elif tipo == 'category':
+            df[coluna] = df[coluna].astype('category')
+    return df
+
+
+def _ler_planilha_homologados(caminho):
+    """
+    Lê a planilha de homologados com as colunas e tipos de ESQUEMAS_PLANILHAS_HOMOLOGACAO.
+
+    Quando há coluna cnpj, acrescenta cnpj_digitos (ver _cnpj_digitos), gravada
+    junto no snapshot para que a comparação por CNPJ seja uma igualdade simples.
+
+    Args:
+        caminho: Caminho absoluto do arquivo .xlsx
+
+    Returns:
+        DataFrame com as colunas normalizadas
+    """
+    nome_planilha = PLANILHAS_HOMOLOGACAO[0]
+    esquema = ESQUEMAS_PLANILHAS_HOMOLOGACAO[nome_planilha]
+    df = pd.read_excel(caminho, usecols=lambda coluna: _nome_coluna_normalizado(coluna) in esquema)
+    df = _aplicar_esquema_planilha(_normalizar_colunas_planilha(df), nome_planilha)
+    if 'cnpj' in df.columns:
+        df['cnpj_digitos'] = pd.Series(
+            [_cnpj_digitos(valor) for valor in df['cnpj'].astype(object).tolist()],
+            index=df.index,
+            dtype=object,
+        )
+    return df
+
+
+def _valor_celula(valores, indice):
+    """
+    Lê o valor de uma célula de uma linha do openpyxl como o pandas faria.
+
+    Células vazias e os marcadores de vazio padrão do pandas viram None, e
+    números inteiros gravados como float voltam a ser inteiros.
+
+    Args:
+        valores: Tupla de valores da linha (iter_rows com values_only=True)
+        indice: Posição da coluna, ou None se a coluna não existe
+
+    Returns:
+        Valor da célula ou None
+    """
+    if indice is None or indice >= len(valores):
+        return None
+    valor = valores[indice]
+    if isinstance(valor, str) and valor in VALORES_VAZIOS_PLANILHA:
+        return None
+    if isinstance(valor, float):
+        if math.isnan(valor):
+            return None
+        if valor.is_integer():
+            return int(valor)
+    return valor
+
+
+def _linhas_controle_qualidade(caminho):
+    """
+    Percorre a planilha de controle de qualidade linha a linha, sem montar um DataFrame.
+
+    Usa o openpyxl em modo read_only, de modo que a memória usada não depende do
+    tamanho da planilha. A ausência de uma coluna esperada é registrada no log.
+
+    Args:
+        caminho: Caminho absoluto do arquivo .xlsx
+
+    Yields:
+        Tuplas (nome_agente, nota, observacao), com a nota já convertida em float
+    """
+    nome_planilha = os.path.basename(caminho)
+    workbook = openpyxl.load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        linhas = workbook.worksheets[0].iter_rows(values_only=True)
+        posicoes = {}
+        for indice, coluna in enumerate(next(linhas, None) or ()):
+            if coluna is not None:
+                posicoes.setdefault(_nome_coluna_normalizado(coluna), indice)
+        for coluna in COLUNAS_CONTROLE_QUALIDADE:
+            if coluna in posicoes:
+                continue
+            if coluna in COLUNAS_OBRIGATORIAS_PLANILHAS.get(nome_planilha, ()):
+                app.logger.error(f"Coluna obrigatória '{coluna}' ausente na planilha {nome_planilha}")
+            else:
+                app.logger.warning(f"Coluna '{coluna}' ausente na planilha {nome_planilha}")
+        indice_agente = posicoes.get('nome_agente')
+        indice_nota = posicoes.get('nota')
+        indice_observacao = posicoes.get('observacao')
+        for valores in linhas:
+            yield (
+                _valor_celula(valores, indice_agente),
+                _to_float(_valor_celula(valores, indice_nota)),
+                _valor_celula(valores, indice_observacao),
+            )
+    finally:
+        workbook.close()
+
+
+def _agregar_controle_qualidade(caminho):
+    """
+    Acumula, em uma única passada, os agregados por agente do controle de qualidade.
+
+    Para cada nome de agente guarda a soma das notas válidas (com compensação de
+    Neumaier, para não acumular erro de arredondamento), a quantidade de notas e
+    as observações com o número da linha. Nenhuma linha é mantida em memória.
+
+    Args:
+        caminho: Caminho absoluto do arquivo .xlsx
+
+    Returns:
+        Dicionário com 'total_linhas' e 'agregados' (nome -> [soma, compensacao,
+        total, [(linha, observacao)]]), só com tipos nativos para o snapshot
+    """
+    agregados = {}
+    total_linhas = 0
+    for linha, (nome_agente, nota, observacao) in enumerate(_linhas_controle_qualidade(caminho)):
+        total_linhas = linha + 1
+        if nome_agente is None:
+            continue
+        agregado = agregados.get(nome_agente)
+        if agregado is None:
+            agregado = agregados[nome_agente] = [0.0, 0.0, 0, []]
+        if nota is not None:
+            soma = agregado[0] + nota
+            if abs(agregado[0]) >= abs(nota):
+                agregado[1] += (agregado[0] - soma) + nota
+            else:
+                agregado[1] += (nota - soma) + agregado[0]
+            agregado[0] = soma
+            agregado[2] += 1
+        if observacao is not None:
+            agregado[3].append((linha, str(observacao)))
+    return {'total_linhas': total_linhas, 'agregados': agregados}
+
+
+def _ler_planilha_com_snapshot(caminho, ler):
+    """
+    Lê uma planilha de homologação usando um snapshot binário gravado ao lado do xlsx.
+
+    O snapshot (pickle do resultado de `ler`) guarda o mtime e o tamanho do xlsx
+    de origem; enquanto eles não mudam, a planilha é carregada do snapshot sem
+    passar pelo openpyxl. Quando o xlsx muda, ou o snapshot está
+    ausente/corrompido, a planilha é relida e o snapshot regravado.
+
+    Args:
+        caminho: Caminho absoluto do arquivo .xlsx
+        ler: Função que lê o xlsx e devolve o conteúdo a guardar no snapshot
+
+    Returns:
+        O conteúdo devolvido por `ler`
+    """
+    info = os.stat(caminho)
+    assinatura = (info.st_mtime_ns, info.st_size)
+    caminho_snapshot = caminho + PLANILHA_SNAPSHOT_SUFIXO
+    try:
+        with open(caminho_snapshot, 'rb') as arquivo:
+            payload = pickle.load(arquivo)
+        if (
+            isinstance(payload, dict)
+            and payload.get('versao') == PLANILHA_SNAPSHOT_VERSAO
+            and payload.get('assinatura') == assinatura
+        ):
+            return payload['conteudo']
+    except FileNotFoundError:
+        pass
+    except Exception as exc:
+        print(f'Snapshot {caminho_snapshot} invalido, relendo a planilha: {exc}')
+    conteudo = ler(caminho)
+    payload = {'versao': PLANILHA_SNAPSHOT_VERSAO, 'assinatura': assinatura, 'conteudo': conteudo}
+    caminho_temporario = f'{caminho_snapshot}.{os.getpid()}.tmp'
+    try:
+        with open(caminho_temporario, 'wb') as arquivo:
+            pickle.dump(payload, arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(caminho_temporario, caminho_snapshot)
+    except OSError as exc:
+        print(f'Falha ao gravar snapshot {caminho_snapshot}: {exc}')
+        try:
+            os.remove(caminho_temporario)
+        except OSError:
+            pass
+    return conteudo
+
+
+def _localizar_planilhas_homologacao():
+    """
+    Localiza as planilhas de homologados e de controle de qualidade.
+
+    Returns:
+        Lista [caminho_homologados, caminho_controle]
+
+    Raises:
+        FileNotFoundError: Se alguma das planilhas não for encontrada
+    """
+    caminhos = [_resolver_planilha(nome) for nome in PLANILHAS_HOMOLOGACAO]
+    if not all(caminhos):
+        raise FileNotFoundError('Planilhas de homologação não encontradas.')
+    return caminhos
+
+
+def _construir_planilhas_homologacao(caminhos):
+    """
+    Carrega as duas planilhas de homologação a partir dos snapshots binários.
+
+    Args:
+        caminhos: Lista [caminho_homologados, caminho_controle]
+
+    Returns:
+        Tupla (df_homologados, controle_qualidade), sendo controle_qualidade
+        um _AgregadosControleQualidade
+    """
+    path_homologados, path_controle = caminhos
+    return (
+        _ler_planilha_com_snapshot(path_homologados, _ler_planilha_homologados),
+        _AgregadosControleQualidade(_ler_planilha_com_snapshot(path_controle, _agregar_controle_qualidade)),
+    )
+
+
+def _aquecer_indices_homologacao(planilhas):
+    """
+    Constrói os índices derivados das planilhas de homologação antes da troca do snapshot.
+
+    Assim a nova versão já chega às requisições com os índices prontos.
+
+    Args:
+        planilhas: Tupla (df_homologados, controle_qualidade)
+    """
+    df_homologados, _ = planilhas
+    if df_homologados is None:
+        return
+    if 'agente' in df_homologados.columns:
+        _indice_derivado('agentes_homologados', df_homologados, _IndiceAgentesHomologados)
+    if not df_homologados.empty:
+        _indice_derivado('registros_homologados', df_homologados, _IndiceRegistrosHomologados)
+
+
+_SNAPSHOT_HOMOLOGACAO = _SnapshotArquivo(
+    'homologacao',
+    _localizar_planilhas_homologacao,
+    _construir_planilhas_homologacao,
+    aquecer=_aquecer_indices_homologacao,
+    ao_recarregar=lambda planilhas: _atualizar_resumos_apos_recarga(planilhas),
+)
+
+
+def _carregar_planilhas_homologacao_versionadas():
+    """
+    Carrega as planilhas de homologação junto com um identificador da versão carregada.
+
+    A versão identifica o conteúdo usado nos cálculos: no modo de planilha, a
+    assinatura (mtime/tamanho) dos arquivos do snapshot; no modo 'banco', a
+    versão gravada pela última importação em importacoes_planilhas (bancos
+    importados antes dessa tabela usam os últimos ids importados). Serve para
+    saber se dados derivados das planilhas (como os resumos de fornecedores)
+    estão desatualizados.
+
+    Returns:
+        Tupla (versao, df_homologados, controle_qualidade); sem planilhas, a
+        versão é 'indisponivel' e os dados são None
+    """
+    if _planilhas_no_banco():
+        importacao = (
+            db.session.query(ImportacaoPlanilhas.versao)
+            .order_by(ImportacaoPlanilhas.id.desc())
+            .limit(1)
+            .scalar()
+        )
+        if importacao:
+            return f'banco:{importacao}', None, None
+        ultimo_homologado = db.session.query(func.max(PlanilhaHomologado.id)).scalar()
+        ultimo_controle = db.session.query(func.max(PlanilhaControleQualidade.id)).scalar()
+        return f'banco:{ultimo_homologado or 0}:{ultimo_controle or 0}', None, None
+    try:
+        assinatura, (df_homologados, controle_qualidade) = _SNAPSHOT_HOMOLOGACAO.obter_estado()
+    except FileNotFoundError:
+        print('Planilhas de homologação não encontradas. Continuando sem dados de planilha.')
+        return 'indisponivel', None, None
+    except Exception as exc:
+        print(f'Erro ao carregar planilhas de homologação: {exc}')
+        return 'indisponivel', None, None
+    versao = hashlib.sha1(repr(assinatura).encode('utf-8')).hexdigest()[:16]
+    return versao, df_homologados, controle_qualidade
+
+
 def _carregar_planilhas_homologacao():
     """
     Carrega as planilhas de homologação e controle de qualidade.
     
     Localiza e carrega duas planilhas essenciais: fornecedores_homologados.xlsx
     (com dados de homologação) e atendimento controle_qualidade.xlsx (com notas IQF).
-    Normaliza os nomes das colunas para facilitar o acesso aos dados.
+    Os dados vêm do cache do worker ou dos snapshots binários gravados ao lado
+    dos xlsx: a planilha de homologados como DataFrame, com os nomes das colunas
+    já normalizados, e a de controle de qualidade como agregados por agente. São
+    compartilhados entre requisições e não devem ser alterados.
+    
+    No modo PLANILHAS_FONTE='banco' as planilhas não são carregadas, pois as
+    consultas passam a usar as tabelas importadas.
     
     Returns:
-        Tupla (df_homologados, df_controle) ou (None, None) se não encontradas
+        Tupla (df_homologados, controle_qualidade) ou (None, None) se não encontradas
     """
-    path_homologados = _resolver_planilha('fornecedores_homologados.xlsx')
-    path_controle = _resolver_planilha('atendimento controle_qualidade.xlsx')
-    if not path_homologados or not path_controle:
-        print('Planilhas de homologação não encontradas. Continuando sem dados de planilha.')
+    if _planilhas_no_banco():
         return None, None
+    _, df_homologados, controle_qualidade = _carregar_planilhas_homologacao_versionadas()
+    return df_homologados, controle_qualidade
+
+_INDICES_DERIVADOS = {}
+_INDICES_DERIVADOS_LOCK = threading.Lock()
+_INDICES_DERIVADOS_VERSOES = 2
+
+
+def _indice_derivado(nome, df, construir):
+    """
+    Retorna um índice derivado de um DataFrame de planilha, construído uma única vez.
+
+    Os DataFrames das planilhas são compartilhados entre requisições enquanto o
+    arquivo não muda, então o índice é associado à identidade do DataFrame: uma
+    nova versão da planilha gera um novo índice. Apenas as versões mais recentes
+    de cada índice são mantidas, para que requisições ainda usando a versão
+    anterior não precisem reconstruí-lo.
+
+    Args:
+        nome: Identificador do tipo de índice
+        df: DataFrame de origem (não deve ser alterado)
+        construir: Função que recebe o DataFrame e devolve o índice
+
+    Returns:
+        Índice construído por `construir` para este DataFrame
+    """
+    for df_indexado, indice in _INDICES_DERIVADOS.get(nome, ()):
+        if df_indexado is df:
+            return indice
+    with _INDICES_DERIVADOS_LOCK:
+        versoes = _INDICES_DERIVADOS.get(nome, ())
+        for df_indexado, indice in versoes:
+            if df_indexado is df:
+                return indice
+        indice = construir(df)
+        _INDICES_DERIVADOS[nome] = ((df, indice),) + versoes[:_INDICES_DERIVADOS_VERSOES - 1]
+        return indice
+
+
+def _valores_coluna(df, coluna):
+    """
+    Retorna os valores de uma coluna como lista, ou Nones se ela não existir.
+
+    Args:
+        df: DataFrame de origem
+        coluna: Nome da coluna
+
+    Returns:
+        Lista com um valor por linha do DataFrame
+    """
+    if coluna in df.columns:
+        return df[coluna].tolist()
+    return [None] * len(df)
+
+
+def _texto_ou_none(valor):
+    """
+    Converte um valor de planilha em texto, tratando vazios/NaN como None.
+
+    Args:
+        valor: Valor lido da planilha
+
+    Returns:
+        String ou None
+    """
+    if valor is None:
+        return None
     try:
-        df_homologados = pd.read_excel(path_homologados)
-        df_controle = pd.read_excel(path_controle)
-        df_homologados.columns = (
-            df_homologados.columns.str.strip().str.lower().str.replace(' ', '_')
-        )
-        df_controle.columns = (
-            df_controle.columns.str.strip().str.lower().str.replace(' ', '_')
-        )
-        return df_homologados, df_controle
-    except Exception as exc:
-        print(f'Erro ao carregar planilhas de homologação: {exc}')
-        return None, None
+        if pd.isna(valor):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return str(valor)
+
+
+def _importar_planilhas_para_banco():
+    """
+    Importa as planilhas de homologação para as tabelas do banco de dados.
+
+    Substitui todo o conteúdo de planilha_homologados e planilha_controle_qualidade
+    pelas linhas atuais das planilhas, já com os nomes normalizados e o CNPJ
+    limpo nas colunas indexadas usadas pelas consultas do modo 'banco'. Cada
+    importação grava uma nova versão em importacoes_planilhas, na mesma
+    transação, para que resumos e caches saibam que as planilhas mudaram (os
+    ids das linhas podem se repetir entre importações no SQLite).
+
+    Returns:
+        Tupla (total_homologados, total_controle) com as linhas importadas
+
+    Raises:
+        FileNotFoundError: Se as planilhas não forem encontradas
+    """
+    df_homologados, _ = _SNAPSHOT_HOMOLOGACAO.obter(sincrono=True)
+    registros_homologados = []
+    colunas_homologados = zip(
+        _valores_coluna(df_homologados, 'codigo'),
+        _valores_coluna(df_homologados, 'agente'),
+        _valores_coluna(df_homologados, 'nome_fantasia'),
+        _valores_coluna(df_homologados, 'cnpj'),
+        _valores_coluna(df_homologados, 'aprovado'),
+        _valores_coluna(df_homologados, 'nota_homologacao'),
+        _valores_coluna(df_homologados, 'iqf'),
+    )
+    for linha, (codigo, agente, nome_fantasia, cnpj, aprovado, nota, iqf) in enumerate(colunas_homologados):
+        agente = _texto_ou_none(agente)
+        nome_fantasia = _texto_ou_none(nome_fantasia)
+        cnpj = _texto_ou_none(cnpj)
+        aprovado = _texto_ou_none(aprovado)
+        codigo_float = _to_float(codigo)
+        registros_homologados.append({
+            'linha': linha,
+            'codigo': int(codigo_float) if codigo_float is not None else None,
+            'agente': agente,
+            'agente_normalizado': _normalize_text(agente) if agente is not None else None,
+            'nome_fantasia': nome_fantasia,
+            'nome_fantasia_normalizado': _normalize_text(nome_fantasia) if nome_fantasia is not None else None,
+            'cnpj': cnpj.replace('\r', '').replace('\n', '').strip() if cnpj is not None else None,
+            'cnpj_digitos': _cnpj_digitos(cnpj),
+            'aprovado': aprovado.strip() if aprovado is not None else None,
+            'nota_homologacao': _to_float(nota),
+            'iqf': _to_float(iqf),
+        })
+    registros_controle = []
+    linhas_controle = _linhas_controle_qualidade(_localizar_planilhas_homologacao()[1])
+    for linha, (nome_agente, nota, observacao) in enumerate(linhas_controle):
+        nome_agente = _texto_ou_none(nome_agente)
+        registros_controle.append({
+            'linha': linha,
+            'nome_agente': nome_agente,
+            'nome_agente_normalizado': _normalize_text(nome_agente) if nome_agente is not None else None,
+            'nome_agente_chave': nome_agente.strip().lower() if nome_agente is not None else None,
+            'nota': _to_float(nota),
+            'observacao': _texto_ou_none(observacao),
+        })
+    try:
+        PlanilhaControleQualidade.query.delete()
+        PlanilhaHomologado.query.delete()
+        if registros_homologados:
+            db.session.execute(PlanilhaHomologado.__table__.insert(), registros_homologados)
+        if registros_controle:
+            db.session.execute(PlanilhaControleQualidade.__table__.insert(), registros_controle)
+        db.session.add(ImportacaoPlanilhas(versao=uuid.uuid4().hex))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    if _planilhas_no_banco():
+        try:
+            _atualizar_resumos_fornecedores()
+        except Exception as exc:
+            print(f'Erro ao atualizar resumos após importar planilhas: {exc}')
+    return len(registros_homologados), len(registros_controle)
+
+
+@app.cli.command('importar-planilhas')
+def importar_planilhas_comando():
+    """
+    Comando `flask importar-planilhas`: carrega as planilhas de homologação no banco.
+    """
+    total_homologados, total_controle = _importar_planilhas_para_banco()
+    print(
+        f'{total_homologados} linhas de homologados e {total_controle} linhas '
+        f'de controle de qualidade importadas.'
+    )
+
 
 def _to_float(value):
     """
@@ -1630,42 +3089,596 @@ def _to_float(value):
     except (TypeError, ValueError):
         return None
     
-def _calcular_media_iqf_controle(fornecedor_nome_planilha, fornecedor_nome_busca, df_controle):
+_METACARACTERES_REGEX = frozenset('.^$*+?{}[]\\|()')
+
+
+def _termo_e_literal(termo):
+    """
+    Indica se um termo de busca não contém metacaracteres de expressão regular.
+
+    As buscas do pandas com `str.contains` interpretam o termo como regex; só
+    termos literais podem ser atendidos pelos índices de substring.
+
+    Args:
+        termo: Texto de busca
+
+    Returns:
+        True se o termo puder ser tratado como texto literal
+    """
+    return not any(ch in _METACARACTERES_REGEX for ch in termo)
+
+
+class _IndiceTrigramas:
+    """
+    Índice de trigramas para busca de substring sobre um conjunto de textos.
+
+    Cada texto distinto é decomposto em trigramas; uma busca intersecta as
+    listas dos trigramas do termo e só confirma com `in` os poucos candidatos
+    restantes. Os resultados vêm na ordem em que os textos foram informados,
+    preservando a semântica de "primeira ocorrência" das buscas lineares.
+    """
+
+    def __init__(self, textos):
+        self.textos = tuple(textos)
+        listas = {}
+        for posicao, texto in enumerate(self.textos):
+            for trigrama in {texto[i:i + 3] for i in range(len(texto) - 2)}:
+                listas.setdefault(trigrama, []).append(posicao)
+        self._listas = listas
+
+    def contendo(self, termo):
+        """
+        Retorna as posições dos textos que contêm o termo, em ordem crescente.
+
+        Termos com menos de três caracteres não têm trigramas e são verificados
+        diretamente contra os textos distintos.
+
+        Args:
+            termo: Substring buscada (já normalizada como os textos)
+
+        Returns:
+            Lista de posições em self.textos
+        """
+        if len(termo) < 3:
+            return [posicao for posicao, texto in enumerate(self.textos) if termo in texto]
+        listas = sorted(
+            (self._listas.get(termo[i:i + 3], ()) for i in range(len(termo) - 2)),
+            key=len,
+        )
+        if not listas[0]:
+            return []
+        candidatos = set(listas[0])
+        for lista in listas[1:]:
+            candidatos.intersection_update(lista)
+            if not candidatos:
+                return []
+        return [posicao for posicao in sorted(candidatos) if termo in self.textos[posicao]]
+
+
+class _IndiceAgentesHomologados:
+    """
+    Índice de busca por substring sobre a coluna agente da planilha de homologados.
+
+    Mapeia cada nome de agente distinto (em minúsculas) para a primeira linha em
+    que aparece e indexa esses nomes por trigramas, para localizar a primeira
+    linha cujo agente contém o termo sem percorrer a planilha inteira.
+    """
+
+    def __init__(self, df_homologados):
+        primeiras_linhas = {}
+        for posicao, valor in enumerate(df_homologados['agente'].tolist()):
+            if isinstance(valor, str):
+                primeiras_linhas.setdefault(valor.lower(), posicao)
+        self._primeiras_linhas = tuple(primeiras_linhas.values())
+        self._trigramas = _IndiceTrigramas(primeiras_linhas)
+
+    def primeira_linha_contendo(self, termo):
+        """
+        Posição da primeira linha cujo agente contém o termo (sem diferenciar maiúsculas).
+
+        Args:
+            termo: Termo literal de busca
+
+        Returns:
+            Posição da linha no DataFrame ou None
+        """
+        posicoes = self._trigramas.contendo(termo.lower())
+        if not posicoes:
+            return None
+        return min(self._primeiras_linhas[posicao] for posicao in posicoes)
+
+
+class _AgregadosControleQualidade:
+    """
+    Agregados por agente da planilha de controle de qualidade.
+
+    Recebe o resultado de _agregar_controle_qualidade (soma, quantidade de notas
+    válidas e observações de cada nome de agente, acumulados linha a linha) e
+    monta os índices de consulta: por nome normalizado, usado no cálculo da
+    média IQF do portal e do painel, e por nome em minúsculas, usado na consulta
+    de homologação. Os fallbacks por substring usam índices de trigramas sobre
+    os nomes distintos, nunca sobre as linhas.
+    """
+
+    def __init__(self, estado):
+        self.total_linhas = estado['total_linhas']
+        self._agregados = tuple(estado['agregados'].values())
+        nomes = tuple(estado['agregados'])
+        self._nomes = nomes
+        normalizados = {}
+        exatos = {}
+        minusculos = {}
+        for posicao, nome in enumerate(nomes):
+            normalizados.setdefault(_normalize_text(str(nome)), []).append(posicao)
+            if isinstance(nome, str):
+                exatos.setdefault(nome.strip().lower(), []).append(posicao)
+                minusculos.setdefault(nome.lower(), []).append(posicao)
+        self._exatos = exatos
+        self._posicoes_normalizadas = normalizados
+        self.chaves = tuple(normalizados)
+        self._trigramas = _IndiceTrigramas(self.chaves)
+        self._posicoes_minusculas = tuple(minusculos.values())
+        self._trigramas_minusculos = _IndiceTrigramas(minusculos)
+        self.agregados = {
+            chave: self._combinar(posicoes) for chave, posicoes in normalizados.items()
+        }
+
+    def _combinar(self, posicoes):
+        """
+        Junta os agregados de vários nomes de agente.
+
+        Args:
+            posicoes: Posições dos nomes em self._nomes
+
+        Returns:
+            Tupla (media, total, observacoes) com as observações na ordem da planilha
+        """
+        agregados = [self._agregados[posicao] for posicao in posicoes]
+        total = sum(agregado[2] for agregado in agregados)
+        media = math.fsum(agregado[0] + agregado[1] for agregado in agregados) / total if total else None
+        if len(agregados) == 1:
+            observacoes = agregados[0][3]
+        else:
+            observacoes = heapq.merge(*(agregado[3] for agregado in agregados))
+        return media, total, [texto for _, texto in observacoes]
+
+    def chaves_contendo(self, termo):
+        """
+        Lista os nomes normalizados que contêm o termo, na ordem da planilha.
+
+        Args:
+            termo: Termo já normalizado com _normalize_text
+
+        Returns:
+            Lista de chaves compatíveis
+        """
+        return [self.chaves[posicao] for posicao in self._trigramas.contendo(termo)]
+
+    def consultar_iqf(self, alvo_normalizado, termo_normalizado):
+        """
+        Retorna (media, total, observacoes) para um agente.
+
+        Usa a correspondência exata do nome normalizado e, se não houver, reúne
+        todos os agentes cujo nome contém o termo, na ordem original da planilha.
+
+        Args:
+            alvo_normalizado: Nome normalizado buscado por igualdade
+            termo_normalizado: Termo normalizado para o fallback por substring
+
+        Returns:
+            Tupla (media_iqf, total_notas, observacoes) ou (None, 0, [])
+        """
+        agregado = self.agregados.get(alvo_normalizado)
+        if agregado is not None:
+            media, total, observacoes = agregado
+            return media, total, list(observacoes)
+        chaves = self.chaves_contendo(termo_normalizado)
+        if not chaves:
+            return None, 0, []
+        if len(chaves) == 1:
+            media, total, observacoes = self.agregados[chaves[0]]
+            return media, total, list(observacoes)
+        posicoes = []
+        for chave in chaves:
+            posicoes.extend(self._posicoes_normalizadas[chave])
+        return self._combinar(posicoes)
+
+    def consultar_por_termo(self, agente_chave, termo):
+        """
+        Retorna os agregados de um agente para a consulta de homologação.
+
+        Procura primeiro pelo nome exato (sem espaços nas bordas e sem diferenciar
+        maiúsculas) e, se não houver, pelos agentes cujo nome contém o termo.
+
+        Args:
+            agente_chave: Nome do agente em minúsculas e sem espaços nas bordas
+            termo: Termo de busca informado pelo usuário (fallback)
+
+        Returns:
+            Tupla (media_iqf, total_notas, observacoes) com as observações sem
+            espaços nas bordas, na ordem da planilha
+        """
+        posicoes = self._exatos.get(agente_chave, [])
+        if not posicoes and termo:
+            if _termo_e_literal(termo):
+                posicoes = []
+                for posicao in self._trigramas_minusculos.contendo(termo.lower()):
+                    posicoes.extend(self._posicoes_minusculas[posicao])
+            else:
+                padrao = re.compile(termo, flags=re.IGNORECASE)
+                posicoes = [
+                    posicao for posicao, nome in enumerate(self._nomes)
+                    if isinstance(nome, str) and padrao.search(nome)
+                ]
+        if not posicoes:
+            return None, 0, []
+        media, total, observacoes = self._combinar(posicoes)
+        return media, total, [observacao.strip() for observacao in observacoes]
+
+
+def _calcular_media_iqf_controle(fornecedor_nome_planilha, fornecedor_nome_busca, controle_qualidade):
     """
     Calcula a média das notas IQF de um fornecedor na planilha de controle de qualidade.
     
     Busca todas as ocorrências do fornecedor na planilha de controle, calcula a média
     das notas válidas e retorna também o total de notas e observações associadas.
+    Os agregados por agente são acumulados uma vez por versão da planilha.
     
     Args:
         fornecedor_nome_planilha: Nome do fornecedor como aparece na planilha
         fornecedor_nome_busca: Nome alternativo para busca (fallback)
-        df_controle: DataFrame da planilha de controle de qualidade
+        controle_qualidade: Agregados da planilha de controle de qualidade
         
     Returns:
         Tupla (media_iqf, total_notas, observacoes) ou (None, 0, []) se não encontrado
     """
-    if df_controle is None or df_controle.empty:
-        return None, 0, []
-    if 'nome_agente' not in df_controle.columns:
-        return None, 0, []
-    nomes_series = df_controle['nome_agente'].astype(str)
-    normalizados = nomes_series.apply(_normalize_text).astype(str)
+    if _planilhas_no_banco():
+        return _calcular_media_iqf_banco(fornecedor_nome_planilha, fornecedor_nome_busca)
+    if controle_qualidade is None:
+        return None, 0, []
+    return controle_qualidade.consultar_iqf(
+        _normalize_text(fornecedor_nome_planilha or fornecedor_nome_busca),
+        _normalize_text(fornecedor_nome_busca)
+    )
+
+def _planilhas_no_banco():
+    """
+    Indica se os dados de homologação devem ser lidos das tabelas importadas.
+
+    Controlado por PLANILHAS_FONTE ('arquivo' ou 'banco'). No modo 'banco' as
+    consultas usam as tabelas planilha_homologados e planilha_controle_qualidade,
+    preenchidas pelo comando `flask importar-planilhas` ou pelo endpoint
+    /api/admin/planilhas/importar.
+
+    Returns:
+        True se a fonte configurada for o banco de dados
+    """
+    return app.config.get('PLANILHAS_FONTE') == 'banco'
+
+
+def _registro_homologado_dict(registro):
+    """
+    Converte uma linha de PlanilhaHomologado no formato de linha da planilha.
+
+    Args:
+        registro: Objeto PlanilhaHomologado
+
+    Returns:
+        Dicionário com as mesmas chaves das colunas normalizadas da planilha
+    """
+    return {
+        'codigo': registro.codigo,
+        'agente': registro.agente,
+        'nome_fantasia': registro.nome_fantasia,
+        'cnpj': registro.cnpj,
+        'aprovado': registro.aprovado,
+        'nota_homologacao': registro.nota_homologacao,
+        'iqf': registro.iqf,
+    }
+
+
+class _IndiceRegistrosHomologados:
+    """
+    Índice da planilha de homologados por nome normalizado e por CNPJ.
+
+    Guarda, para cada nome normalizado de agente ou nome_fantasia e para cada
+    CNPJ só com dígitos (coluna cnpj_digitos do snapshot), a posição da primeira linha em que aparece. Localizar a linha de
+    um fornecedor vira uma consulta de dicionário, em vez de normalizar a
+    planilha inteira a cada fornecedor.
+    """
+
+    def __init__(self, df_homologados):
+        posicoes = np.arange(len(df_homologados))
+        partes = [
+            pd.DataFrame({
+                'chave': _normalize_text_series(df_homologados[coluna]).to_numpy(dtype=object),
+                'posicao': posicoes,
+            })
+            for coluna in ('agente', 'nome_fantasia')
+            if coluna in df_homologados.columns
+        ]
+        self._por_nome = self._primeiras_posicoes(partes)
+        self._por_cnpj = {}
+        if 'cnpj_digitos' in df_homologados.columns:
+            self._por_cnpj = self._primeiras_posicoes([
+                pd.DataFrame({
+                    'chave': df_homologados['cnpj_digitos'].to_numpy(dtype=object),
+                    'posicao': posicoes,
+                }).dropna(subset=['chave'])
+            ])
+
+    @staticmethod
+    def _primeiras_posicoes(partes):
+        if not partes:
+            return {}
+        return pd.concat(partes).groupby('chave', sort=False)['posicao'].min().to_dict()
+
+    def posicao(self, nome_normalizado, cnpj_digitos):
+        """
+        Posição da primeira linha compatível com o nome ou, na falta dele, com o CNPJ.
+
+        Args:
+            nome_normalizado: Nome do fornecedor normalizado com _normalize_text
+            cnpj_digitos: CNPJ do fornecedor só com dígitos (ver _cnpj_digitos)
+
+        Returns:
+            Posição da linha no DataFrame ou None
+        """
+        posicao = self._por_nome.get(nome_normalizado)
+        if posicao is None and cnpj_digitos:
+            posicao = self._por_cnpj.get(cnpj_digitos)
+        return posicao
+
+
+def _em_lotes(valores, tamanho=500):
+    """
+    Divide uma sequência em listas, para consultas com IN de tamanho limitado.
+
+    Aceita qualquer iterável (inclusive resultados de query com yield_per), que
+    é consumido aos poucos.
+
+    Args:
+        valores: Lista ou iterável de valores
+        tamanho: Quantidade máxima de valores por fatia
+
+    Yields:
+        Listas com até `tamanho` valores
+    """
+    iterador = iter(valores)
+    while True:
+        lote = list(itertools.islice(iterador, tamanho))
+        if not lote:
+            return
+        yield lote
+
+
+def _buscar_registros_homologados_banco(fornecedores):
+    """
+    Versão em lote da busca na tabela planilha_homologados.
+
+    Resolve todos os fornecedores com consultas IN pelas colunas normalizadas
+    (e por cnpj_digitos para os que não forem encontrados pelo nome), mantendo sempre
+    a linha de menor número da planilha.
+
+    Args:
+        fornecedores: Lista de objetos Fornecedor
+
+    Returns:
+        Lista alinhada com `fornecedores`, com dicionários da linha ou None
+    """
+    alvos = [_normalize_text(fornecedor.nome) for fornecedor in fornecedores]
+    por_nome = {}
+    for lote in _em_lotes(sorted(set(alvos))):
+        registros = PlanilhaHomologado.query.filter(
+            or_(
+                PlanilhaHomologado.agente_normalizado.in_(lote),
+                PlanilhaHomologado.nome_fantasia_normalizado.in_(lote)
+            )
+        ).all()
+        chaves_lote = set(lote)
+        for registro in registros:
+            for chave in (registro.agente_normalizado, registro.nome_fantasia_normalizado):
+                atual = por_nome.get(chave)
+                if chave in chaves_lote and (atual is None or registro.linha < atual.linha):
+                    por_nome[chave] = registro
+    cnpjs = [fornecedor.cnpj_digitos for fornecedor in fornecedores]
+    cnpjs_pendentes = sorted({
+        cnpj
+        for cnpj, alvo in zip(cnpjs, alvos)
+        if alvo not in por_nome and cnpj
+    })
+    por_cnpj = {}
+    for lote in _em_lotes(cnpjs_pendentes):
+        for registro in PlanilhaHomologado.query.filter(PlanilhaHomologado.cnpj_digitos.in_(lote)).all():
+            atual = por_cnpj.get(registro.cnpj_digitos)
+            if atual is None or registro.linha < atual.linha:
+                por_cnpj[registro.cnpj_digitos] = registro
+    resultado = []
+    for alvo, cnpj in zip(alvos, cnpjs):
+        registro = por_nome.get(alvo)
+        if registro is None and cnpj:
+            registro = por_cnpj.get(cnpj)
+        resultado.append(_registro_homologado_dict(registro) if registro is not None else None)
+    return resultado
+
+
+def _buscar_registros_homologados(fornecedores, df_homologados):
+    """
+    Localiza as linhas da planilha de homologados de vários fornecedores de uma vez.
+
+    Compara o nome normalizado de cada fornecedor com as colunas agente e
+    nome_fantasia e, se não encontrar, tenta pelo CNPJ. Retorna sempre a
+    primeira linha compatível, na ordem da planilha.
+
+    Args:
+        fornecedores: Lista de objetos Fornecedor
+        df_homologados: DataFrame da planilha de fornecedores homologados
+
+    Returns:
+        Lista alinhada com `fornecedores`, com a linha encontrada (Series ou
+        dicionário) ou None
+    """
+    if _planilhas_no_banco():
+        return _buscar_registros_homologados_banco(fornecedores)
+    if df_homologados is None or df_homologados.empty:
+        return [None] * len(fornecedores)
+    indice = _indice_derivado('registros_homologados', df_homologados, _IndiceRegistrosHomologados)
+    resultado = []
+    for fornecedor in fornecedores:
+        posicao = indice.posicao(_normalize_text(fornecedor.nome), fornecedor.cnpj_digitos)
+        resultado.append(df_homologados.iloc[posicao] if posicao is not None else None)
+    return resultado
+
+
+def _buscar_homologado_por_termo(termo, df_homologados):
+    """
+    Busca o primeiro fornecedor homologado cujo agente contém o termo informado.
+
+    A busca ignora maiúsculas/minúsculas e retorna a primeira linha compatível
+    na ordem da planilha (ou da importação, no modo banco).
+
+    Args:
+        termo: Texto digitado para busca
+        df_homologados: DataFrame da planilha de fornecedores homologados
+
+    Returns:
+        Linha encontrada (Series ou dicionário) ou None
+    """
+    if _planilhas_no_banco():
+        registro = PlanilhaHomologado.query.filter(
+            PlanilhaHomologado.agente.ilike(f'%{termo}%')
+        ).order_by(PlanilhaHomologado.linha.asc()).first()
+        return _registro_homologado_dict(registro) if registro is not None else None
+    if df_homologados is None or 'agente' not in df_homologados.columns:
+        return None
+    if _termo_e_literal(termo):
+        indice = _indice_derivado('agentes_homologados', df_homologados, _IndiceAgentesHomologados)
+        posicao = indice.primeira_linha_contendo(termo)
+        return df_homologados.iloc[posicao] if posicao is not None else None
+    filtro = df_homologados[
+        df_homologados['agente'].str.contains(termo, case=False, na=False)
+    ]
+    if filtro.empty:
+        return None
+    return filtro.iloc[0]
+
+
+def _agregados_controle_por_termo(agente, termo, controle_qualidade):
+    """
+    Reúne a média, o total de notas e as observações do controle de qualidade de um agente.
+
+    Procura primeiro pelo nome exato do agente (sem diferenciar maiúsculas) e,
+    se não houver ocorrências, pelas linhas cujo agente contém o termo buscado.
+
+    Args:
+        agente: Nome do agente como aparece na planilha de homologados
+        termo: Termo de busca informado pelo usuário (fallback)
+        controle_qualidade: Agregados da planilha de controle de qualidade
+
+    Returns:
+        Tupla (media_iqf, total_notas, observacoes) com os textos de observação
+        (já sem espaços nas bordas) na ordem da planilha
+    """
+    agente_chave = str(agente or '').strip().lower()
+    if _planilhas_no_banco():
+        colunas = (PlanilhaControleQualidade.nota, PlanilhaControleQualidade.observacao)
+        registros = db.session.query(*colunas).filter(
+            PlanilhaControleQualidade.nome_agente_chave == agente_chave
+        ).order_by(PlanilhaControleQualidade.linha.asc()).all()
+        if not registros and termo:
+            registros = db.session.query(*colunas).filter(
+                PlanilhaControleQualidade.nome_agente_chave.contains(termo.lower(), autoescape=True)
+            ).order_by(PlanilhaControleQualidade.linha.asc()).all()
+        notas = [nota for nota, _ in registros if nota is not None]
+        media = float(pd.Series(notas, dtype='float64').mean()) if notas else None
+        observacoes = [observacao.strip() for _, observacao in registros if observacao is not None]
+        return media, len(notas), observacoes
+    if controle_qualidade is None:
+        return None, 0, []
+    return controle_qualidade.consultar_por_termo(agente_chave, termo)
+
+
+def _calcular_media_iqf_banco(fornecedor_nome_planilha, fornecedor_nome_busca):
+    """
+    Versão de _calcular_media_iqf_controle que consulta a tabela importada.
+
+    Usa o índice de nome_agente_normalizado para a correspondência exata e só
+    recorre à busca por substring quando ela não encontra ocorrências.
+
+    Args:
+        fornecedor_nome_planilha: Nome do fornecedor como aparece na planilha
+        fornecedor_nome_busca: Nome alternativo para busca (fallback)
+
+    Returns:
+        Tupla (media_iqf, total_notas, observacoes) ou (None, 0, []) se não encontrado
+    """
+    colunas = (PlanilhaControleQualidade.nota, PlanilhaControleQualidade.observacao)
     alvo_normalizado = _normalize_text(fornecedor_nome_planilha or fornecedor_nome_busca)
-    mask = normalizados == alvo_normalizado
-    if not mask.any():
-        mask = normalizados.str.contains(_normalize_text(fornecedor_nome_busca), regex=False)
-    subset = df_controle[mask]
-    if subset.empty:
+    registros = db.session.query(*colunas).filter(
+        PlanilhaControleQualidade.nome_agente_normalizado == alvo_normalizado
+    ).order_by(PlanilhaControleQualidade.linha.asc()).all()
+    if not registros:
+        registros = db.session.query(*colunas).filter(
+            PlanilhaControleQualidade.nome_agente_normalizado.contains(
+                _normalize_text(fornecedor_nome_busca), autoescape=True
+            )
+        ).order_by(PlanilhaControleQualidade.linha.asc()).all()
+    if not registros:
         return None, 0, []
-    notas_validas = pd.to_numeric(subset.get('nota'), errors='coerce').dropna()
+    notas_validas = [nota for nota, _ in registros if nota is not None]
     total = len(notas_validas)
-    media = float(notas_validas.mean()) if total else None
-    observacoes = []
-    if 'observacao' in subset.columns:
-        observacoes = subset['observacao'].dropna().astype(str).tolist()
+    media = float(pd.Series(notas_validas, dtype='float64').mean()) if total else None
+    observacoes = [observacao for _, observacao in registros if observacao is not None]
     return media, total, observacoes
 
+
+def _calcular_medias_iqf_controle(pares_nomes, controle_qualidade):
+    """
+    Versão em lote de _calcular_media_iqf_controle.
+
+    No modo de planilha cada consulta já é uma busca no índice por agente; no
+    modo 'banco' as correspondências exatas de todos os fornecedores saem de uma
+    única consulta IN agrupada em memória, e só os não encontrados recorrem à
+    busca por substring.
+
+    Args:
+        pares_nomes: Lista de tuplas (fornecedor_nome_planilha, fornecedor_nome_busca)
+        controle_qualidade: Agregados da planilha de controle de qualidade
+
+    Returns:
+        Lista alinhada com `pares_nomes`, de tuplas (media_iqf, total_notas, observacoes)
+    """
+    if not _planilhas_no_banco():
+        return [
+            _calcular_media_iqf_controle(nome_planilha, nome_busca, controle_qualidade)
+            for nome_planilha, nome_busca in pares_nomes
+        ]
+    alvos = [_normalize_text(nome_planilha or nome_busca) for nome_planilha, nome_busca in pares_nomes]
+    ocorrencias = {}
+    for lote in _em_lotes(sorted(set(alvos))):
+        registros = db.session.query(
+            PlanilhaControleQualidade.nome_agente_normalizado,
+            PlanilhaControleQualidade.nota,
+            PlanilhaControleQualidade.observacao,
+        ).filter(
+            PlanilhaControleQualidade.nome_agente_normalizado.in_(lote)
+        ).order_by(PlanilhaControleQualidade.linha.asc()).all()
+        for chave, nota, observacao in registros:
+            ocorrencias.setdefault(chave, []).append((nota, observacao))
+    resultado = []
+    for (nome_planilha, nome_busca), alvo in zip(pares_nomes, alvos):
+        registros = ocorrencias.get(alvo)
+        if not registros:
+            resultado.append(_calcular_media_iqf_banco(nome_planilha, nome_busca))
+            continue
+        notas_validas = [nota for nota, _ in registros if nota is not None]
+        total = len(notas_validas)
+        media = float(pd.Series(notas_validas, dtype='float64').mean()) if total else None
+        observacoes = [observacao for _, observacao in registros if observacao is not None]
+        resultado.append((media, total, observacoes))
+    return resultado
+
+
 def _determinar_status_final(aprovado_valor, nota_homologacao, iqf_calculada, nota_iqf_planilha):
     """
     Determina o status final de homologação baseado em múltiplos critérios.
@@ -1694,125 +3707,388 @@ def _determinar_status_final(aprovado_valor, nota_homologacao, iqf_calculada, no
     return 'EM_ANALISE'
 
 
+def _determinar_status_final_lote(aprovados, notas_homologacao, iqfs_calculadas, notas_iqf_planilha):
+    """
+    Versão vetorizada de _determinar_status_final para vários fornecedores.
+
+    Aplica as mesmas regras com operações do numpy sobre as colunas de valores:
+    qualquer nota válida abaixo de 70 reprova; caso contrário vale o campo
+    aprovado ('N' reprova, 'S' aprova) e, sem ele, o fornecedor fica em análise.
+
+    Args:
+        aprovados: Lista de valores 'S'/'N' da planilha de homologados
+        notas_homologacao: Lista de notas de homologação (ou None)
+        iqfs_calculadas: Lista de médias IQF calculadas (ou None)
+        notas_iqf_planilha: Lista de notas IQF da planilha (ou None)
 
-def _montar_registro_admin(fornecedor, df_homologados, df_controle):
+    Returns:
+        Lista de status ('APROVADO', 'REPROVADO' ou 'EM_ANALISE')
     """
-    Monta um registro completo de fornecedor para a área administrativa.
-    
+    if not aprovados:
+        return []
+    reprovado_por_nota = np.zeros(len(aprovados), dtype=bool)
+    for valores in (iqfs_calculadas, notas_iqf_planilha, notas_homologacao):
+        notas = np.array([_to_float(valor) for valor in valores], dtype='float64')
+        reprovado_por_nota |= np.isfinite(notas) & (notas < 70)
+    aprovados = np.array([(valor or '').strip().upper() for valor in aprovados], dtype=object)
+    status = np.where(
+        reprovado_por_nota | (aprovados == 'N'),
+        'REPROVADO',
+        np.where(aprovados == 'S', 'APROVADO', 'EM_ANALISE'),
+    )
+    return status.tolist()
+
+
+
+def _opcoes_carga_registro_admin():
+    """
+    Opções de carregamento dos relacionamentos usados por _montar_registros_admin.
+
+    Carrega a nota manual e os documentos de todos os fornecedores da consulta em
+    uma consulta extra por relacionamento (selectin), em vez de uma consulta por
+    fornecedor ao acessar fornecedor.nota_admin e fornecedor.documentos.
+
+    Returns:
+        Tupla de opções para `Query.options`
+    """
+    return (
+        selectinload(Fornecedor.nota_admin),
+        selectinload(Fornecedor.documentos),
+    )
+
+
+def _montar_registros_admin(fornecedores, df_homologados, controle_qualidade):
+    """
+    Monta os registros completos de vários fornecedores para a área administrativa.
+
     Consolida informações do banco de dados, planilhas de homologação e controle
     de qualidade, incluindo notas manuais do admin, status, documentos e datas.
-    Usado para exibir dados detalhados na interface administrativa.
-    
+    As linhas das planilhas de todos os fornecedores são resolvidas de uma vez
+    (índice por nome normalizado/CNPJ e agregados de IQF por agente) e o status
+    é calculado de forma vetorizada, de modo que o custo cresce com o número de
+    fornecedores mais o tamanho das planilhas, e não com o produto dos dois.
+
     Args:
-        fornecedor: Objeto Fornecedor do banco de dados
+        fornecedores: Lista de objetos Fornecedor do banco de dados
         df_homologados: DataFrame da planilha de fornecedores homologados
-        df_controle: DataFrame da planilha de controle de qualidade
-        
+        controle_qualidade: Agregados da planilha de controle de qualidade
+
     Returns:
-        Dicionário com todas as informações consolidadas do fornecedor
+        Lista de dicionários com as informações consolidadas de cada fornecedor,
+        na mesma ordem de `fornecedores`
     """
-    nota_homologacao = None
-    nota_manual = getattr(fornecedor, 'nota_admin', None)
-    status_manual = None
-    observacao_admin = None
-    decisao_atualizada_em = None
-    nota_referencia_manual = None
-    if nota_manual:
-        if nota_manual.nota_homologacao is not None:
+    registros = _buscar_registros_homologados(fornecedores, df_homologados)
+    dados = []
+    for fornecedor, registro in zip(fornecedores, registros):
+        nota_homologacao = None
+        nota_manual = getattr(fornecedor, 'nota_admin', None)
+        status_manual = None
+        observacao_admin = None
+        decisao_atualizada_em = None
+        nota_referencia_manual = None
+        if nota_manual:
+            if nota_manual.nota_homologacao is not None:
+                try:
+                    nota_homologacao = float(nota_manual.nota_homologacao)
+                except (TypeError, ValueError):
+                    nota_homologacao = None
+            status_manual_raw = (nota_manual.status_decisao or '').strip().upper() if nota_manual.status_decisao else ''
+            if status_manual_raw in {'APROVADO', 'REPROVADO', 'EM_ANALISE'}:
+                status_manual = status_manual_raw
+            observacao_admin = nota_manual.observacao_admin
+            nota_referencia_manual = nota_manual.nota_referencia
+            decisao_atualizada_em = nota_manual.decisao_atualizada_em
+        nota_iqf_planilha = None
+        fornecedor_nome_planilha = fornecedor.nome
+        aprovado_valor = ''
+        if registro is not None:
+            fornecedor_nome_planilha = str(registro.get('agente', fornecedor.nome))
+            aprovado_valor = str(registro.get('aprovado', '')).strip().upper()
+            if nota_homologacao is None:
+                nota_homologacao = _to_float(registro.get('nota_homologacao'))
+            nota_iqf_planilha = _to_float(registro.get('iqf'))
+        dados.append({
+            'fornecedor': fornecedor,
+            'nome_planilha': fornecedor_nome_planilha,
+            'aprovado': aprovado_valor,
+            'nota_homologacao': nota_homologacao,
+            'nota_iqf_planilha': nota_iqf_planilha,
+            'status_manual': status_manual,
+            'observacao_admin': observacao_admin,
+            'nota_referencia_manual': nota_referencia_manual,
+            'decisao_atualizada_em': decisao_atualizada_em,
+        })
+    medias_iqf = _calcular_medias_iqf_controle(
+        [(item['nome_planilha'], item['fornecedor'].nome) for item in dados],
+        controle_qualidade,
+    )
+    for item, (media_iqf_controle, total_notas_controle, observacoes_lista) in zip(dados, medias_iqf):
+        iqf_final = media_iqf_controle if media_iqf_controle is not None else item['nota_iqf_planilha']
+        if iqf_final is None and item['nota_referencia_manual'] is not None:
             try:
-                nota_homologacao = float(nota_manual.nota_homologacao)
+                iqf_final = float(item['nota_referencia_manual'])
             except (TypeError, ValueError):
-                nota_homologacao = None
-        status_manual_raw = (nota_manual.status_decisao or '').strip().upper() if nota_manual.status_decisao else ''
-        if status_manual_raw in {'APROVADO', 'REPROVADO', 'EM_ANALISE'}:
-            status_manual = status_manual_raw
-        observacao_admin = nota_manual.observacao_admin
-        nota_referencia_manual = nota_manual.nota_referencia
-        decisao_atualizada_em = nota_manual.decisao_atualizada_em
-    nota_iqf_planilha = None
-    fornecedor_nome_planilha = fornecedor.nome
-    aprovado_valor = ''
-    registros_compativeis = pd.DataFrame()
-    if df_homologados is not None and not df_homologados.empty:
-        candidatos = []
-        for coluna in ['agente', 'nome_fantasia']:
-            if coluna in df_homologados.columns:
-                candidatos.append(
-                    df_homologados[coluna].apply(_normalize_text) == _normalize_text(fornecedor.nome)
-                )
-        if candidatos:
-            mask = candidatos[0]
-            for extra in candidatos[1:]:
-                mask = mask | extra
-            registros_compativeis = df_homologados[mask]
-        if registros_compativeis.empty and 'cnpj' in df_homologados.columns:
-            registros_compativeis = df_homologados[
-                df_homologados['cnpj'].astype(str)
-                .str.replace('\r', '')
-                .str.replace('\n', '')
-                .str.strip()
-                == fornecedor.cnpj.strip()
-            ]
-    if not registros_compativeis.empty:
-        registro = registros_compativeis.iloc[0]
-        fornecedor_nome_planilha = str(registro.get('agente', fornecedor.nome))
-        aprovado_valor = str(registro.get('aprovado', '')).strip().upper()
-        if nota_homologacao is None:
-            nota_homologacao = _to_float(registro.get('nota_homologacao'))
-        nota_iqf_planilha = _to_float(registro.get('iqf'))
-    media_iqf_controle, total_notas_controle, observacoes_lista = _calcular_media_iqf_controle(
-        fornecedor_nome_planilha, fornecedor.nome, df_controle
+                iqf_final = None
+        item['media_iqf'] = media_iqf_controle
+        item['total_notas'] = total_notas_controle
+        item['observacoes'] = observacoes_lista
+        item['iqf_final'] = iqf_final
+    status_calculados = _determinar_status_final_lote(
+        [item['aprovado'] for item in dados],
+        [item['nota_homologacao'] for item in dados],
+        [item['iqf_final'] for item in dados],
+        [item['nota_iqf_planilha'] for item in dados],
     )
-    iqf_final = media_iqf_controle if media_iqf_controle is not None else nota_iqf_planilha
-    if iqf_final is None and nota_referencia_manual is not None:
-        try:
-            iqf_final = float(nota_referencia_manual)
-        except (TypeError, ValueError):
-            iqf_final = None
-    status_final = _determinar_status_final(aprovado_valor, nota_homologacao, iqf_final, nota_iqf_planilha)
-    if status_manual:
-        status_final = status_manual
-    documentos = [
+    resultado = []
+    for item, status_calculado in zip(dados, status_calculados):
+        fornecedor = item['fornecedor']
+        status_final = item['status_manual'] or status_calculado
+        documentos = [
+            {
+                'id': doc.id,
+                'nome': doc.nome_documento,
+                'categoria': doc.categoria,
+                'data_upload': doc.data_upload.isoformat() if doc.data_upload else None
+            }
+            for doc in fornecedor.documentos
+        ]
+        ultima_doc = max(
+            [doc.data_upload for doc in fornecedor.documentos if doc.data_upload],
+            default=None
+        )
+        ultima_atividade = max(
+            [valor for valor in [fornecedor.data_cadastro, ultima_doc] if valor],
+            default=None
+        )
+        decisao_atualizada_em = item['decisao_atualizada_em']
+        resultado.append({
+            'id': fornecedor.id,
+            'nome': fornecedor.nome,
+            'email': fornecedor.email,
+            'cnpj': fornecedor.cnpj,
+            'categoria': fornecedor.categoria,
+            'status': status_final,
+            'aprovado': status_final == 'APROVADO',
+            'nota_homologacao': item['nota_homologacao'],
+            'nota_iqf': item['iqf_final'],
+            'nota_iqf_planilha': item['nota_iqf_planilha'],
+            'nota_iqf_media': item['media_iqf'],
+            'total_notas_iqf': item['total_notas'],
+            'observacoes': item['observacoes'],
+            'observacao_admin': item['observacao_admin'],
+            'nota_referencia_admin': item['nota_referencia_manual'],
+            'decisao_atualizada_em': decisao_atualizada_em.isoformat() if decisao_atualizada_em else None,
+            'documentos': documentos,
+            'total_documentos': len(documentos),
+            'ultima_atividade': ultima_atividade.isoformat() if ultima_atividade else None,
+            'data_cadastro': fornecedor.data_cadastro.isoformat() if fornecedor.data_cadastro else None
+        })
+    return resultado
+
+
+def _montar_registro_admin(fornecedor, df_homologados, controle_qualidade):
+    """
+    Monta um registro completo de fornecedor para a área administrativa.
+
+    Versão de um único fornecedor de _montar_registros_admin, usada pelos
+    endpoints que atualizam ou exibem um fornecedor específico.
+
+    Args:
+        fornecedor: Objeto Fornecedor do banco de dados
+        df_homologados: DataFrame da planilha de fornecedores homologados
+        controle_qualidade: Agregados da planilha de controle de qualidade
+
+    Returns:
+        Dicionário com todas as informações consolidadas do fornecedor
+    """
+    return _montar_registros_admin([fornecedor], df_homologados, controle_qualidade)[0]
+
+def _gravar_resumos_fornecedores(registros, versao):
+    """
+    Grava na tabela resumos_fornecedores o status e as notas de registros admin já montados.
+
+    No PostgreSQL e no SQLite a gravação é um upsert (INSERT ... ON CONFLICT DO
+    UPDATE), para que duas atualizações simultâneas do mesmo fornecedor (por
+    exemplo em workers diferentes) não falhem com IntegrityError.
+
+    Args:
+        registros: Dicionários devolvidos por _montar_registros_admin
+        versao: Versão das planilhas usada para montar os registros
+    """
+    agora = datetime.utcnow()
+    valores = [
         {
-            'id': doc.id,
-            'nome': doc.nome_documento,
-            'categoria': doc.categoria,
-            'data_upload': doc.data_upload.isoformat() if doc.data_upload else None
+            'fornecedor_id': registro['id'],
+            'status': registro['status'],
+            'nota_iqf': _to_float(registro['nota_iqf']),
+            'nota_homologacao': _to_float(registro['nota_homologacao']),
+            'ultima_atividade': (
+                datetime.fromisoformat(registro['ultima_atividade']) if registro['ultima_atividade'] else None
+            ),
+            'versao_planilhas': versao,
+            'atualizado_em': agora,
         }
-        for doc in fornecedor.documentos
+        for registro in registros
     ]
-    ultima_doc = max(
-        [doc.data_upload for doc in fornecedor.documentos if doc.data_upload],
-        default=None
-    )
-    ultima_atividade = max(
-        [valor for valor in [fornecedor.data_cadastro, ultima_doc] if valor],
-        default=None
-    )
-    return {
-        'id': fornecedor.id,
-        'nome': fornecedor.nome,
-        'email': fornecedor.email,
-        'cnpj': fornecedor.cnpj,
-        'categoria': fornecedor.categoria,
-        'status': status_final,
-        'aprovado': status_final == 'APROVADO',
-        'nota_homologacao': nota_homologacao,
-        'nota_iqf': iqf_final,
-        'nota_iqf_planilha': nota_iqf_planilha,
-        'nota_iqf_media': media_iqf_controle,
-        'total_notas_iqf': total_notas_controle,
-        'observacoes': observacoes_lista,
-        'observacao_admin': observacao_admin,
-        'nota_referencia_admin': nota_referencia_manual,
-        'decisao_atualizada_em': decisao_atualizada_em.isoformat() if decisao_atualizada_em else None,
-        'documentos': documentos,
-        'total_documentos': len(documentos),
-        'ultima_atividade': ultima_atividade.isoformat() if ultima_atividade else None,
-        'data_cadastro': fornecedor.data_cadastro.isoformat() if fornecedor.data_cadastro else None
-    }
+    if not valores:
+        return
+    dialect = db.engine.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = insert_postgresql if dialect == 'postgresql' else insert_sqlite
+        comando = insert(ResumoFornecedor.__table__)
+        comando = comando.on_conflict_do_update(
+            index_elements=['fornecedor_id'],
+            set_={
+                coluna: comando.excluded[coluna]
+                for coluna in valores[0]
+                if coluna != 'fornecedor_id'
+            },
+        )
+        for lote in _em_lotes(valores):
+            db.session.execute(comando, lote)
+        return
+    ids = [registro['id'] for registro in registros]
+    existentes = {}
+    for lote in _em_lotes(ids):
+        for resumo in ResumoFornecedor.query.filter(ResumoFornecedor.fornecedor_id.in_(lote)).all():
+            existentes[resumo.fornecedor_id] = resumo
+    for item in valores:
+        resumo = existentes.get(item['fornecedor_id'])
+        if resumo is None:
+            resumo = ResumoFornecedor(fornecedor_id=item['fornecedor_id'])
+            db.session.add(resumo)
+        for coluna, valor in item.items():
+            setattr(resumo, coluna, valor)
+
+
+def _atualizar_resumos_fornecedores(fornecedores=None):
+    """
+    Recalcula os resumos (status, IQF final e nota) de fornecedores.
+
+    Sem lista de fornecedores, atualiza apenas os que ainda não têm resumo ou
+    cujo resumo foi calculado com outra versão das planilhas. Executado fora
+    das requisições: na thread de recarga das planilhas, na importação para o
+    banco e em _ATUALIZADOR_RESUMOS depois das escritas que mudam o status.
+
+    Args:
+        fornecedores: Lista opcional de objetos Fornecedor a recalcular
+
+    Returns:
+        Quantidade de resumos gravados
+    """
+    versao, df_homologados, controle_qualidade = _carregar_planilhas_homologacao_versionadas()
+    if fornecedores is None:
+        fornecedores = (
+            Fornecedor.query.options(*_opcoes_carga_registro_admin())
+            .outerjoin(ResumoFornecedor)
+            .filter(
+                or_(
+                    ResumoFornecedor.fornecedor_id.is_(None),
+                    ResumoFornecedor.versao_planilhas.is_(None),
+                    ResumoFornecedor.versao_planilhas != versao,
+                )
+            )
+            .all()
+        )
+    if not fornecedores:
+        return 0
+    registros = _montar_registros_admin(fornecedores, df_homologados, controle_qualidade)
+    try:
+        _gravar_resumos_fornecedores(registros, versao)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(registros)
+
 
-def _montar_resumo_portal(fornecedor, df_homologados, df_controle):
+class _AtualizadorResumos:
+    """
+    Recalcula resumos de fornecedores numa thread em segundo plano.
+
+    As requisições só agendam o recálculo e leem o que já estiver gravado em
+    resumos_fornecedores, mesmo que desatualizado por alguns instantes. Pedidos
+    feitos enquanto a thread trabalha são acumulados e atendidos na rodada
+    seguinte; cada rodada também completa os resumos ausentes ou calculados com
+    outra versão das planilhas.
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._ids_pendentes = set()
+        self._pendente = False
+        self._executando = False
+
+    def agendar(self, fornecedor_ids=()):
+        """
+        Agenda o recálculo dos fornecedores informados (e dos resumos desatualizados).
+
+        Args:
+            fornecedor_ids: IDs dos fornecedores alterados
+        """
+        with self._trava:
+            self._ids_pendentes.update(fornecedor_ids)
+            self._pendente = True
+            if self._executando:
+                return
+            self._executando = True
+        threading.Thread(target=self._executar, name='resumos-fornecedores', daemon=True).start()
+
+    def _executar(self):
+        while True:
+            with self._trava:
+                if not self._pendente:
+                    self._executando = False
+                    return
+                ids = list(self._ids_pendentes)
+                self._ids_pendentes.clear()
+                self._pendente = False
+            with app.app_context():
+                try:
+                    for lote in _em_lotes(ids):
+                        _atualizar_resumos_fornecedores(
+                            Fornecedor.query.options(*_opcoes_carga_registro_admin())
+                            .filter(Fornecedor.id.in_(lote))
+                            .all()
+                        )
+                    _atualizar_resumos_fornecedores()
+                except Exception as exc:
+                    print(f'Erro ao atualizar resumos de fornecedores: {exc}')
+
+
+_ATUALIZADOR_RESUMOS = _AtualizadorResumos()
+
+
+def _atualizar_resumos_apos_escrita(fornecedor):
+    """
+    Agenda o recálculo do resumo de um fornecedor depois de uma escrita já confirmada.
+
+    Também descarta o resumo do portal em cache. O recálculo roda em
+    _ATUALIZADOR_RESUMOS, fora da requisição.
+
+    Args:
+        fornecedor: Objeto Fornecedor alterado
+    """
+    _CACHE_RESUMO_PORTAL.invalidar(fornecedor.id)
+    _ATUALIZADOR_RESUMOS.agendar([fornecedor.id])
+
+
+def _atualizar_resumos_apos_recarga(_planilhas):
+    """
+    Recalcula os resumos desatualizados depois que as planilhas são recarregadas.
+
+    Executado na thread de recarga do snapshot, fora das requisições.
+    """
+    with app.app_context():
+        try:
+            total = _atualizar_resumos_fornecedores()
+            if total:
+                print(f'{total} resumos de fornecedores atualizados após recarga das planilhas.')
+        except Exception as exc:
+            print(f'Erro ao atualizar resumos após recarga das planilhas: {exc}')
+
+
+def _montar_resumo_portal(fornecedor, df_homologados, controle_qualidade):
     """
     Monta um resumo simplificado do fornecedor para o portal do fornecedor.
     
@@ -1823,12 +4099,12 @@ def _montar_resumo_portal(fornecedor, df_homologados, df_controle):
     Args:
         fornecedor: Objeto Fornecedor do banco de dados
         df_homologados: DataFrame da planilha de fornecedores homologados
-        df_controle: DataFrame da planilha de controle de qualidade
+        controle_qualidade: Agregados da planilha de controle de qualidade
         
     Returns:
         Dicionário com resumo formatado para o portal do fornecedor
     """
-    info_admin = _montar_registro_admin(fornecedor, df_homologados, df_controle)
+    info_admin = _montar_registro_admin(fornecedor, df_homologados, controle_qualidade)
     ocorrencias = [
         str(item).strip()
         for item in info_admin.get('observacoes', []) or []
@@ -1911,104 +4187,661 @@ def _admin_usuario_autorizado():
 @app.route('/api/admin/login', methods=['POST'])
 def admin_login():
     """
-    Endpoint de login para administradores.
+    Endpoint de login para administradores.
+    
+    Autentica administradores usando e-mail e senha. O e-mail deve estar na lista
+    de e-mails permitidos e a senha deve corresponder à senha administrativa.
+    Retorna um token JWT com role 'admin' para acesso aos endpoints administrativos.
+    
+    Returns:
+        JSON com access_token e email (200) ou erro (401/500)
+    """
+    try:
+        data = request.get_json() or {}
+        email = (data.get('email') or '').strip().lower()
+        senha = data.get('senha') or ''
+        if email in ADMIN_ALLOWED_EMAILS and senha == ADMIN_PASSWORD:
+            token = create_access_token(identity=email, additional_claims={'role': 'admin'})
+            return jsonify(access_token=token, email=email), 200
+        return jsonify(message='Credenciais inválidas'), 401
+    except Exception as exc:
+        print(f'Erro no login admin: {exc}')
+        return jsonify(message='Erro ao autenticar administrador'), 500
+    
+@app.route('/api/admin/dashboard', methods=['GET'])
+@jwt_required()
+def painel_admin_dashboard():
+    """
+    Endpoint que retorna estatísticas gerais para o dashboard administrativo.
+    
+    Calcula totais de fornecedores cadastrados, documentos enviados e distribuição
+    de status (aprovados, reprovados, em análise). A distribuição vem da tabela
+    resumos_fornecedores, mantida em segundo plano (_ATUALIZADOR_RESUMOS e
+    recarga das planilhas); a contagem usa os resumos já gravados. Requer
+    autenticação de admin.
+    
+    Returns:
+        JSON com estatísticas do dashboard (200) ou erro (403/500)
+    """
+    if not _admin_usuario_autorizado():
+        return jsonify(message='Acesso nao autorizado.'), 403
+    try:
+        total_cadastrados = db.session.query(func.count(Fornecedor.id)).scalar()
+        total_documentos = db.session.query(func.count(Documento.id)).scalar()
+        status_counts = {'APROVADO': 0, 'REPROVADO': 0, 'EM_ANALISE': 0}
+        status_counts.update(
+            db.session.query(ResumoFornecedor.status, func.count(ResumoFornecedor.fornecedor_id))
+            .group_by(ResumoFornecedor.status)
+            .all()
+        )
+        return jsonify(
+            total_cadastrados=total_cadastrados,
+            total_aprovados=status_counts.get('APROVADO', 0),
+            total_em_analise=status_counts.get('EM_ANALISE', 0),
+            total_reprovados=status_counts.get('REPROVADO', 0),
+            total_documentos=total_documentos
+        ), 200
+    except FileNotFoundError as e:
+        return jsonify(message=str(e)), 500
+    except Exception as exc:
+        print(f'Erro no dashboard admin: {exc}')
+        return jsonify(message='Erro ao gerar dashboard administrativo'), 500
+    
+ADMIN_FORNECEDORES_LIMITE_MAXIMO = 200
+ADMIN_FORNECEDORES_ORDENACOES = ('nome', 'status', 'iqf', 'ultima_atividade', 'data_cadastro', 'relevancia')
+# Tipos aceitos no primeiro valor da chave do cursor admin, por ordenação
+# (na ordenação por nome a chave é só nome e id, e o primeiro valor é None).
+ADMIN_FORNECEDORES_TIPOS_CHAVE = {
+    'nome': (type(None),),
+    'status': (str,),
+    'iqf': (int, float),
+    'ultima_atividade': (str,),
+    'data_cadastro': (str,),
+    'relevancia': (int, float),
+}
+
+
+LISTAGEM_LOTE_STREAMING = 200
+
+
+def _resposta_json_em_fluxo(itens):
+    """
+    Resposta JSON com um array enviado elemento por elemento.
+
+    Cada item é serializado assim que o gerador o produz, então a memória do
+    worker fica limitada a um lote e o primeiro byte sai antes do fim da
+    consulta. Um erro no meio do envio interrompe o array (o cliente recebe
+    JSON incompleto) e fica registrado no log.
+
+    Args:
+        itens: Iterável de dicionários serializáveis
+
+    Returns:
+        Response com mimetype application/json
+    """
+    def gerar():
+        yield '['
+        try:
+            for indice, item in enumerate(itens):
+                yield (',' if indice else '') + app.json.dumps(item)
+        except Exception as exc:
+            app.logger.error(f'Erro ao gerar resposta em fluxo: {exc}')
+            return
+        yield ']'
+
+    return Response(stream_with_context(gerar()), mimetype='application/json')
+
+
+def _codificar_cursor(dados):
+    """
+    Codifica os dados de posição de uma listagem em um cursor opaco.
+
+    Args:
+        dados: Valores serializáveis em JSON
+
+    Returns:
+        String base64 segura para URLs
+    """
+    bruto = json.dumps(dados, separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(bruto).decode('ascii').rstrip('=')
+
+
+def _decodificar_cursor(cursor):
+    """
+    Decodifica um cursor gerado por _codificar_cursor.
+
+    Args:
+        cursor: String recebida do cliente
+
+    Returns:
+        Dados originais do cursor
+
+    Raises:
+        ValueError: Se o cursor for inválido
+    """
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        return json.loads(bruto.decode('utf-8'))
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError('Cursor inválido.') from exc
+
+
+def _filtro_apos_chave(colunas, valores, descendente=False):
+    """
+    Monta o filtro de paginação por chave (keyset): linhas depois da chave informada.
+
+    Equivale a `(c1, c2, ...) > (v1, v2, ...)` (ou `<` na ordem decrescente),
+    escrito com AND/OR para funcionar em qualquer banco.
+
+    Args:
+        colunas: Expressões da chave de ordenação, da mais à menos significativa
+        valores: Valores da última linha da página anterior
+        descendente: Se a ordenação é decrescente
+
+    Returns:
+        Expressão SQLAlchemy do filtro
+    """
+    condicoes = []
+    for indice, (coluna, valor) in enumerate(zip(colunas, valores)):
+        iguais = [anterior == valor_anterior for anterior, valor_anterior in zip(colunas[:indice], valores[:indice])]
+        condicoes.append(and_(*iguais, coluna < valor if descendente else coluna > valor))
+    return or_(*condicoes)
+
+
+def _expressao_ordenacao_admin(ordenacao):
+    """
+    Expressão SQL usada para ordenar a listagem admin pelo campo informado.
+
+    Campos derivados (status, IQF, última atividade) vêm da tabela
+    resumos_fornecedores, mantida em segundo plano; valores nulos (inclusive de
+    fornecedores ainda sem resumo) são trocados por um valor fixo para que a
+    chave de paginação seja sempre comparável.
+
+    Args:
+        ordenacao: Um dos valores de ADMIN_FORNECEDORES_ORDENACOES
+
+    Returns:
+        Expressão SQLAlchemy ou None para a ordenação por nome
+    """
+    if ordenacao == 'status':
+        return func.coalesce(ResumoFornecedor.status, '')
+    if ordenacao == 'iqf':
+        return func.coalesce(ResumoFornecedor.nota_iqf, -1.0)
+    if ordenacao == 'ultima_atividade':
+        return func.coalesce(ResumoFornecedor.ultima_atividade, Fornecedor.data_cadastro)
+    if ordenacao == 'data_cadastro':
+        return Fornecedor.data_cadastro
+    return None
+
+
+def _parametros_listagem_admin(args):
+    """
+    Lê e valida a busca, os filtros e a ordenação da listagem admin.
+
+    Usado pela listagem e pela exportação, para que as duas devolvam os mesmos
+    fornecedores na mesma ordem.
+
+    Args:
+        args: request.args
+
+    Returns:
+        Dicionário com search, status, categoria, sort e order
+
+    Raises:
+        ValueError: Com a mensagem de erro para o cliente
+    """
+    search_term = args.get('search', '', type=str).strip()
+    status_filtro = [
+        valor.strip().upper()
+        for valor in args.get('status', '', type=str).split(',')
+        if valor.strip()
+    ]
+    ordenacao = args.get('sort', '', type=str).strip().lower() or ('relevancia' if search_term else 'nome')
+    if ordenacao == 'relevancia' and not search_term:
+        ordenacao = 'nome'
+    direcao = args.get('order', 'asc', type=str).strip().lower() or 'asc'
+    if ordenacao not in ADMIN_FORNECEDORES_ORDENACOES:
+        raise ValueError(f"Ordenação inválida. Use: {', '.join(ADMIN_FORNECEDORES_ORDENACOES)}.")
+    if direcao not in ('asc', 'desc'):
+        raise ValueError("Direção de ordenação inválida. Use asc ou desc.")
+    if any(status not in {'APROVADO', 'REPROVADO', 'EM_ANALISE'} for status in status_filtro):
+        raise ValueError('Status inválido. Use APROVADO, REPROVADO ou EM_ANALISE.')
+    return {
+        'search': search_term,
+        'status': status_filtro,
+        'categoria': args.get('categoria', '', type=str).strip(),
+        'sort': ordenacao,
+        'order': direcao,
+    }
+
+
+def _consulta_listagem_admin(parametros, chave_posicao=None):
+    """
+    Monta a query da listagem admin a partir de _parametros_listagem_admin.
+
+    Args:
+        parametros: Dicionário de _parametros_listagem_admin
+        chave_posicao: Chave (valor, nome, id) da última linha já enviada, para
+            paginação por chave
+
+    Returns:
+        Tupla (query, com_chave). Com com_chave, cada linha da query é
+        (Fornecedor, valor da chave de ordenação); senão, só o Fornecedor.
+    """
+    search_term = parametros['search']
+    status_filtro = parametros['status']
+    categoria_filtro = parametros['categoria']
+    ordenacao = parametros['sort']
+    descendente = parametros['order'] == 'desc'
+    expressao = _expressao_ordenacao_admin(ordenacao)
+    usa_resumo = status_filtro or ordenacao in ('status', 'iqf', 'ultima_atividade')
+    query = Fornecedor.query.options(*_opcoes_carga_registro_admin())
+    if usa_resumo:
+        query = query.outerjoin(ResumoFornecedor)
+    if search_term:
+        query, relevancia = _filtrar_busca_fornecedores(query, search_term)
+        if ordenacao == 'relevancia':
+            expressao = -relevancia
+    if status_filtro:
+        query = query.filter(ResumoFornecedor.status.in_(status_filtro))
+    if categoria_filtro:
+        query = query.filter(func.lower(Fornecedor.categoria) == categoria_filtro.lower())
+    colunas_chave = [Fornecedor.nome, Fornecedor.id]
+    if expressao is not None:
+        colunas_chave.insert(0, expressao)
+        query = query.add_columns(expressao.label('chave_ordenacao'))
+    if chave_posicao is not None:
+        valores_chave = chave_posicao if expressao is not None else chave_posicao[1:]
+        query = query.filter(_filtro_apos_chave(colunas_chave, valores_chave, descendente))
+    query = query.order_by(*[coluna.desc() if descendente else coluna.asc() for coluna in colunas_chave])
+    return query, expressao is not None
+
+
+def _gerar_registros_admin(query, com_chave, df_homologados, controle_qualidade):
+    """
+    Percorre a query da listagem admin em lotes, gerando um registro por fornecedor.
+
+    Os fornecedores são lidos com yield_per e montados por _montar_registros_admin
+    a cada lote, então só um lote fica em memória de cada vez.
+
+    Args:
+        query: Query de _consulta_listagem_admin
+        com_chave: Segundo valor retornado por _consulta_listagem_admin
+        df_homologados: DataFrame da planilha de homologados
+        controle_qualidade: Agregados do controle de qualidade
+
+    Yields:
+        Dicionários no formato da listagem admin
+    """
+    for lote in _em_lotes(query.yield_per(LISTAGEM_LOTE_STREAMING), LISTAGEM_LOTE_STREAMING):
+        fornecedores = [linha[0] for linha in lote] if com_chave else lote
+        yield from _montar_registros_admin(fornecedores, df_homologados, controle_qualidade)
+
+
+@app.route('/api/admin/fornecedores', methods=['GET'])
+@jwt_required()
+def painel_admin_fornecedores():
+    """
+    Endpoint que lista os fornecedores com informações completas.
     
-    Autentica administradores usando e-mail e senha. O e-mail deve estar na lista
-    de e-mails permitidos e a senha deve corresponder à senha administrativa.
-    Retorna um token JWT com role 'admin' para acesso aos endpoints administrativos.
+    Retorna os fornecedores cadastrados, com opção de busca indexada por nome
+    (sem diferenciar acentos) ou CNPJ, filtros por status e categoria e
+    ordenação no servidor. Com busca, o padrão é ordenar por relevância. Cada fornecedor
+    inclui dados consolidados de homologação, notas e documentos.
+    Com `limit` (ou `cursor`) a lista é paginada por chave (keyset) sobre
+    (campo de ordenação, nome, id): cada página custa o mesmo independente da
+    profundidade, e o cursor da próxima página vem no header X-Proximo-Cursor
+    (ausente na última página). Sem paginação, a lista completa é enviada em
+    fluxo (ver _resposta_json_em_fluxo). Requer autenticação de admin.
     
+    Query Params:
+        search: Termo opcional para buscar por nome ou CNPJ
+        status: Filtro opcional de status (APROVADO, REPROVADO, EM_ANALISE; aceita vários separados por vírgula)
+        categoria: Filtro opcional de categoria (sem diferenciar maiúsculas)
+        sort: nome (padrão), status, iqf, ultima_atividade, data_cadastro ou relevancia (padrão com search)
+        order: asc (padrão) ou desc; em relevancia, asc traz os mais relevantes primeiro
+        limit: Tamanho da página (máximo ADMIN_FORNECEDORES_LIMITE_MAXIMO)
+        cursor: Cursor devolvido pela página anterior
+        
     Returns:
-        JSON com access_token e email (200) ou erro (401/500)
+        JSON com lista de fornecedores (200) ou erro (400/403/500)
     """
+    if not _admin_usuario_autorizado():
+        return jsonify(message='Acesso não autorizado.'), 403
     try:
-        data = request.get_json() or {}
-        email = (data.get('email') or '').strip().lower()
-        senha = data.get('senha') or ''
-        if email in ADMIN_ALLOWED_EMAILS and senha == ADMIN_PASSWORD:
-            token = create_access_token(identity=email, additional_claims={'role': 'admin'})
-            return jsonify(access_token=token, email=email), 200
-        return jsonify(message='Credenciais inválidas'), 401
+        parametros = _parametros_listagem_admin(request.args)
+    except ValueError as exc:
+        return jsonify(message=str(exc)), 400
+    ordenacao = parametros['sort']
+    direcao = parametros['order']
+    cursor = request.args.get('cursor', '', type=str).strip()
+    limite = request.args.get('limit', type=int)
+    paginado = limite is not None or bool(cursor)
+    if paginado:
+        limite = min(max(limite or ADMIN_FORNECEDORES_LIMITE_MAXIMO, 1), ADMIN_FORNECEDORES_LIMITE_MAXIMO)
+    chave_posicao = None
+    if cursor:
+        try:
+            dados_cursor = _decodificar_cursor(cursor)
+            if not isinstance(dados_cursor, dict) or dados_cursor.get('sort') != ordenacao or dados_cursor.get('order') != direcao:
+                raise ValueError('Cursor não corresponde à ordenação informada.')
+            valor, nome, fornecedor_id = dados_cursor['chave']
+            if (
+                isinstance(valor, bool) or not isinstance(valor, ADMIN_FORNECEDORES_TIPOS_CHAVE[ordenacao])
+                or not isinstance(nome, str)
+                or isinstance(fornecedor_id, bool) or not isinstance(fornecedor_id, int)
+            ):
+                raise ValueError('chave incompatível.')
+            if ordenacao in ('ultima_atividade', 'data_cadastro'):
+                valor = datetime.fromisoformat(valor)
+            chave_posicao = (valor, nome, fornecedor_id)
+        except (ValueError, TypeError, KeyError) as exc:
+            return jsonify(message=f'Cursor inválido: {exc}'), 400
+    try:
+        query, com_chave = _consulta_listagem_admin(parametros, chave_posicao)
+        if not paginado:
+            df_homologados, controle_qualidade = _carregar_planilhas_homologacao()
+            return _resposta_json_em_fluxo(
+                _gerar_registros_admin(query, com_chave, df_homologados, controle_qualidade)
+            )
+        linhas = query.limit(limite + 1).all()
+        if com_chave:
+            fornecedores = [fornecedor for fornecedor, _ in linhas]
+            valores_ordenacao = [valor for _, valor in linhas]
+        else:
+            fornecedores = linhas
+            valores_ordenacao = [None] * len(linhas)
+        proximo_cursor = None
+        if len(fornecedores) > limite:
+            fornecedores = fornecedores[:limite]
+            ultimo = fornecedores[-1]
+            valor_ultimo = valores_ordenacao[limite - 1]
+            if isinstance(valor_ultimo, str) and ordenacao in ('ultima_atividade', 'data_cadastro'):
+                valor_ultimo = datetime.fromisoformat(valor_ultimo)
+            if isinstance(valor_ultimo, datetime):
+                valor_ultimo = valor_ultimo.isoformat()
+            proximo_cursor = _codificar_cursor({
+                'sort': ordenacao,
+                'order': direcao,
+                'chave': [valor_ultimo, ultimo.nome, ultimo.id],
+            })
+        df_homologados, controle_qualidade = _carregar_planilhas_homologacao()
+        resultados = _montar_registros_admin(fornecedores, df_homologados, controle_qualidade)
+        response = jsonify(resultados)
+        if proximo_cursor:
+            response.headers['X-Proximo-Cursor'] = proximo_cursor
+        return response, 200
+    except FileNotFoundError as e:
+        return jsonify(message=str(e)), 500
     except Exception as exc:
-        print(f'Erro no login admin: {exc}')
-        return jsonify(message='Erro ao autenticar administrador'), 500
-    
-@app.route('/api/admin/dashboard', methods=['GET'])
+        print(f'Erro ao listar fornecedores admin: {exc}')
+        return jsonify(message='Erro ao listar fornecedores'), 500
+
+
+# Folga (segundos) na comparação com o token de sincronização, para cobrir
+# transações que gravaram atualizado_em antes do token mas só confirmaram depois.
+ALTERACOES_MARGEM_SEGUNDOS = 5
+
+
+@app.route('/api/admin/fornecedores/changes', methods=['GET'])
 @jwt_required()
-def painel_admin_dashboard():
+def alteracoes_admin_fornecedores():
     """
-    Endpoint que retorna estatísticas gerais para o dashboard administrativo.
-    
-    Calcula totais de fornecedores cadastrados, documentos enviados e distribuição
-    de status (aprovados, reprovados, em análise). Requer autenticação de admin.
-    
+    Endpoint de sincronização incremental da listagem admin de fornecedores.
+
+    Com o token da sincronização anterior, retorna só os fornecedores criados
+    ou alterados desde então (pelo atualizado_em de fornecedores, notas e
+    documentos) e os ids excluídos (pelos eventos de exclusão), no formato de
+    /api/admin/fornecedores. Sem token, ou se a versão das planilhas de
+    homologação mudou desde o token, retorna a lista completa com
+    `completo: true`, e o cliente deve substituir a lista que tem.
+    Requer autenticação de admin.
+
+    Query Params:
+        since: Token devolvido pela chamada anterior (opcional)
+
     Returns:
-        JSON com estatísticas do dashboard (200) ou erro (403/500)
+        JSON com fornecedores, removidos, completo e token (200) ou erro (400/403/500)
     """
     if not _admin_usuario_autorizado():
-        return jsonify(message='Acesso nao autorizado.'), 403
+        return jsonify(message='Acesso não autorizado.'), 403
+    token = request.args.get('since', '', type=str).strip()
+    desde = None
+    versao_token = None
+    if token:
+        try:
+            dados_token = _decodificar_cursor(token)
+            desde = datetime.fromisoformat(dados_token['desde'])
+            versao_token = dados_token['versao']
+        except (ValueError, TypeError, KeyError) as exc:
+            return jsonify(message=f'Token inválido: {exc}'), 400
+    agora = datetime.utcnow()
     try:
-        fornecedores_db = Fornecedor.query.all()
-        total_cadastrados = len(fornecedores_db)
-        total_documentos = Documento.query.count()
-        df_homologados, df_controle = _carregar_planilhas_homologacao()
-        status_counts = {'APROVADO': 0, 'REPROVADO': 0, 'EM_ANALISE': 0}
-        for fornecedor in fornecedores_db:
-            info = _montar_registro_admin(fornecedor, df_homologados, df_controle)
-            status_counts[info['status']] = status_counts.get(info['status'], 0) + 1
+        versao, df_homologados, controle_qualidade = _carregar_planilhas_homologacao_versionadas()
+        completo = desde is None or versao_token != versao
+        query = Fornecedor.query.options(*_opcoes_carga_registro_admin())
+        removidos = set()
+        if not completo:
+            limite = desde - timedelta(seconds=ALTERACOES_MARGEM_SEGUNDOS)
+            alterados = union(
+                select(Fornecedor.id).where(Fornecedor.atualizado_em > limite),
+                select(NotaFornecedor.fornecedor_id).where(NotaFornecedor.atualizado_em > limite),
+                select(Documento.fornecedor_id).where(Documento.atualizado_em > limite),
+            )
+            query = query.filter(Fornecedor.id.in_(alterados))
+            removidos = {
+                fornecedor_id
+                for (fornecedor_id,) in db.session.query(Evento.fornecedor_id).filter(
+                    Evento.tipo == 'exclusao',
+                    Evento.criado_em > limite
+                )
+            }
+        fornecedores = query.order_by(Fornecedor.nome, Fornecedor.id).all()
+        removidos -= {fornecedor.id for fornecedor in fornecedores}
+        registros = _montar_registros_admin(fornecedores, df_homologados, controle_qualidade)
         return jsonify(
-            total_cadastrados=total_cadastrados,
-            total_aprovados=status_counts.get('APROVADO', 0),
-            total_em_analise=status_counts.get('EM_ANALISE', 0),
-            total_reprovados=status_counts.get('REPROVADO', 0),
-            total_documentos=total_documentos
+            fornecedores=registros,
+            removidos=sorted(removidos),
+            completo=completo,
+            token=_codificar_cursor({'desde': agora.isoformat(), 'versao': versao})
         ), 200
-    except FileNotFoundError as e:
-        return jsonify(message=str(e)), 500
     except Exception as exc:
-        print(f'Erro no dashboard admin: {exc}')
-        return jsonify(message='Erro ao gerar dashboard administrativo'), 500
-    
-@app.route('/api/admin/fornecedores', methods=['GET'])
+        print(f'Erro ao listar alterações de fornecedores: {exc}')
+        return jsonify(message='Erro ao listar alterações de fornecedores'), 500
+
+
+# Colunas da exportação do cadastro de fornecedores: (chave do registro admin, título).
+COLUNAS_EXPORTACAO_ADMIN = (
+    ('id', 'ID'),
+    ('nome', 'Nome'),
+    ('cnpj', 'CNPJ'),
+    ('email', 'E-mail'),
+    ('categoria', 'Categoria'),
+    ('status', 'Status'),
+    ('nota_homologacao', 'Nota homologação'),
+    ('nota_iqf', 'Nota IQF'),
+    ('nota_iqf_planilha', 'IQF planilha'),
+    ('nota_iqf_media', 'Média IQF'),
+    ('total_notas_iqf', 'Total de notas IQF'),
+    ('total_documentos', 'Total de documentos'),
+    ('observacao_admin', 'Observação do admin'),
+    ('nota_referencia_admin', 'Nota de referência do admin'),
+    ('decisao_atualizada_em', 'Decisão atualizada em'),
+    ('data_cadastro', 'Data de cadastro'),
+    ('ultima_atividade', 'Última atividade'),
+)
+# Caracteres iniciais que fazem o Excel tratar uma célula como fórmula.
+EXPORTACAO_PREFIXOS_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+# Tamanho até o qual a planilha XLSX exportada fica em memória antes de ir para disco.
+EXPORTACAO_XLSX_MEMORIA_MAXIMA = 8 * 1024 * 1024
+
+
+def _celula_exportacao(valor):
+    """
+    Neutraliza textos que o Excel interpretaria como fórmula.
+
+    Nome, e-mail e CNPJ vêm do cadastro público; um texto que comece com
+    EXPORTACAO_PREFIXOS_FORMULA recebe um apóstrofo na frente (injeção de
+    fórmula em CSV/XLSX).
+
+    Args:
+        valor: Valor de uma coluna da exportação
+
+    Returns:
+        O mesmo valor, ou o texto prefixado com "'"
+    """
+    if isinstance(valor, str) and valor.startswith(EXPORTACAO_PREFIXOS_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def _linhas_exportacao_admin(registros):
+    """
+    Converte registros da listagem admin em linhas da exportação.
+
+    Args:
+        registros: Iterável de dicionários de _montar_registros_admin
+
+    Yields:
+        Listas de valores na ordem de COLUNAS_EXPORTACAO_ADMIN, com os textos
+        neutralizados por _celula_exportacao
+    """
+    for registro in registros:
+        yield [_celula_exportacao(registro.get(chave)) for chave, _ in COLUNAS_EXPORTACAO_ADMIN]
+
+
+def _exportacao_csv(linhas, nome_arquivo):
+    """
+    Resposta CSV gerada linha a linha.
+
+    Usa ';' como separador e BOM UTF-8, para que o Excel em português abra o
+    arquivo com colunas e acentos corretos.
+
+    Args:
+        linhas: Iterável de listas de valores
+        nome_arquivo: Nome sugerido para o download
+
+    Returns:
+        Response em fluxo
+    """
+    def gerar():
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer, delimiter=';')
+        escritor.writerow([titulo for _, titulo in COLUNAS_EXPORTACAO_ADMIN])
+        yield '\ufeff' + buffer.getvalue()
+        for linha in linhas:
+            buffer.seek(0)
+            buffer.truncate()
+            escritor.writerow(['' if valor is None else valor for valor in linha])
+            yield buffer.getvalue()
+
+    response = Response(stream_with_context(gerar()), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename="{nome_arquivo}"'
+    return response
+
+
+def _celula_texto_xlsx(planilha, valor):
+    """
+    Célula write-only com o texto gravado explicitamente como string.
+
+    Args:
+        planilha: Planilha write-only do openpyxl
+        valor: Texto da célula
+
+    Returns:
+        WriteOnlyCell do tipo string
+    """
+    celula = WriteOnlyCell(planilha, value=valor)
+    celula.data_type = 's'
+    return celula
+
+
+def _exportacao_xlsx(linhas, nome_arquivo):
+    """
+    Resposta XLSX montada com o openpyxl em modo write-only.
+
+    As linhas são gravadas num SpooledTemporaryFile (em memória até
+    EXPORTACAO_XLSX_MEMORIA_MAXIMA bytes, depois num arquivo temporário anônimo
+    em disco), que é enviado em blocos. O arquivo é fechado por
+    response.call_on_close, mesmo que o envio nem comece. Textos são gravados
+    como células do tipo string, nunca como fórmula.
+
+    Args:
+        linhas: Iterável de listas de valores
+        nome_arquivo: Nome sugerido para o download
+
+    Returns:
+        Response em fluxo
+    """
+    arquivo = tempfile.SpooledTemporaryFile(max_size=EXPORTACAO_XLSX_MEMORIA_MAXIMA, suffix='.xlsx')
+    try:
+        workbook = openpyxl.Workbook(write_only=True)
+        planilha = workbook.create_sheet('Fornecedores')
+        planilha.append([titulo for _, titulo in COLUNAS_EXPORTACAO_ADMIN])
+        for linha in linhas:
+            planilha.append([_celula_texto_xlsx(planilha, valor) if isinstance(valor, str) else valor for valor in linha])
+        workbook.save(arquivo)
+        tamanho = arquivo.tell()
+        arquivo.seek(0)
+    except Exception:
+        arquivo.close()
+        raise
+
+    def enviar():
+        while True:
+            bloco = arquivo.read(64 * 1024)
+            if not bloco:
+                break
+            yield bloco
+
+    response = Response(enviar(), mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+    response.call_on_close(arquivo.close)
+    response.headers['Content-Disposition'] = f'attachment; filename="{nome_arquivo}"'
+    response.headers['Content-Length'] = str(tamanho)
+    return response
+
+
+@app.route('/api/admin/fornecedores/export', methods=['GET'])
 @jwt_required()
-def painel_admin_fornecedores():
+def exportar_admin_fornecedores():
     """
-    Endpoint que lista todos os fornecedores com informações completas.
-    
-    Retorna lista de todos os fornecedores cadastrados, com opção de busca por nome ou CNPJ.
-    Cada fornecedor inclui dados consolidados de homologação, notas e documentos.
-    Requer autenticação de admin.
-    
+    Endpoint que exporta o cadastro de fornecedores em CSV ou XLSX.
+
+    Aceita a mesma busca, filtros e ordenação de /api/admin/fornecedores e
+    gera as linhas a partir dos mesmos registros, em lotes, sem montar a
+    base inteira em memória. Requer autenticação de admin.
+
     Query Params:
-        search: Termo opcional para buscar por nome ou CNPJ
-        
+        format: csv (padrão) ou xlsx
+        search, status, categoria, sort, order: Como em /api/admin/fornecedores
+
     Returns:
-        JSON com lista de fornecedores (200) ou erro (403/500)
+        Arquivo para download (200) ou erro (400/403/500)
     """
     if not _admin_usuario_autorizado():
         return jsonify(message='Acesso não autorizado.'), 403
+    formato = request.args.get('format', 'csv', type=str).strip().lower() or 'csv'
+    if formato not in ('csv', 'xlsx'):
+        return jsonify(message='Formato inválido. Use csv ou xlsx.'), 400
     try:
-        search_term = request.args.get('search', '', type=str).strip()
-        query = Fornecedor.query
-        if search_term:
-            like_term = f"%{search_term}%"
-            query = query.filter(
-                or_(
-                    Fornecedor.nome.ilike(like_term),
-                    Fornecedor.cnpj.ilike(like_term)
-                )
-            )
-        fornecedores = query.order_by(Fornecedor.nome.asc()).all()
-        df_homologados, df_controle = _carregar_planilhas_homologacao()
-        resultados = [
-            _montar_registro_admin(fornecedor, df_homologados, df_controle)
-            for fornecedor in fornecedores
-        ]
-        return jsonify(resultados), 200
+        parametros = _parametros_listagem_admin(request.args)
+    except ValueError as exc:
+        return jsonify(message=str(exc)), 400
+    try:
+        query, com_chave = _consulta_listagem_admin(parametros)
+        df_homologados, controle_qualidade = _carregar_planilhas_homologacao()
+        linhas = _linhas_exportacao_admin(
+            _gerar_registros_admin(query, com_chave, df_homologados, controle_qualidade)
+        )
+        nome_arquivo = f"fornecedores_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{formato}"
+        if formato == 'xlsx':
+            return _exportacao_xlsx(linhas, nome_arquivo)
+        return _exportacao_csv(linhas, nome_arquivo)
     except FileNotFoundError as e:
         return jsonify(message=str(e)), 500
     except Exception as exc:
-        print(f'Erro ao listar fornecedores admin: {exc}')
-        return jsonify(message='Erro ao listar fornecedores'), 500
+        print(f'Erro ao exportar fornecedores admin: {exc}')
+        return jsonify(message='Erro ao exportar fornecedores'), 500
 
 
 @app.route('/api/admin/fornecedores/<int:fornecedor_id>/notas', methods=['PATCH', 'POST', 'OPTIONS'])
@@ -2056,6 +4889,14 @@ def atualizar_nota_fornecedor(fornecedor_id):
             db.session.add(registro_manual)
         registro_manual.nota_homologacao = nota_float
         registro_manual.atualizado_em = datetime.utcnow()
+        _registrar_evento(
+            'nota',
+            'Nota de homologação atualizada',
+            f"{fornecedor.nome}: nota {nota_float:g}",
+            fornecedor_id=fornecedor.id,
+            detalhes={'fornecedor': fornecedor.nome, 'nota_homologacao': nota_float},
+            criado_em=registro_manual.atualizado_em,
+        )
         db.session.commit()
     except Exception as exc:
         db.session.rollback()
@@ -2063,19 +4904,20 @@ def atualizar_nota_fornecedor(fornecedor_id):
         return jsonify(message='Erro ao atualizar nota de homologação.'), 500
 
     df_homologados = None
-    df_controle = None
+    controle_qualidade = None
     try:
-        df_homologados, df_controle = _carregar_planilhas_homologacao()
+        df_homologados, controle_qualidade = _carregar_planilhas_homologacao()
     except FileNotFoundError:
         df_homologados = None
-        df_controle = None
+        controle_qualidade = None
     except Exception as exc:
         print(f'Erro ao carregar planilhas apos atualizar nota: {exc}')
         df_homologados = None
-        df_controle = None
+        controle_qualidade = None
 
-    fornecedor_payload = _montar_registro_admin(fornecedor, df_homologados, df_controle)
+    fornecedor_payload = _montar_registro_admin(fornecedor, df_homologados, controle_qualidade)
     fornecedor_payload['nota_homologacao'] = nota_float
+    _atualizar_resumos_apos_escrita(fornecedor)
     return jsonify(
         message='Nota de homologação atualizada com sucesso.',
         fornecedor=fornecedor_payload
@@ -2139,6 +4981,20 @@ def registrar_decisao_fornecedor(fornecedor_id):
     if enviar_email_flag:
         email_enviado = _enviar_email_decisao(fornecedor, status_informado, observacao)
     registro_manual.email_enviado = email_enviado
+    _registrar_evento(
+        'decisao',
+        'Decisão de homologação registrada',
+        f"{fornecedor.nome}: {status_informado}",
+        fornecedor_id=fornecedor.id,
+        detalhes={
+            'fornecedor': fornecedor.nome,
+            'status': status_informado,
+            'observacao': observacao or None,
+            'nota_referencia': nota_referencia,
+            'email_enviado': email_enviado
+        },
+        criado_em=registro_manual.decisao_atualizada_em,
+    )
 
     try:
         db.session.commit()
@@ -2148,15 +5004,16 @@ def registrar_decisao_fornecedor(fornecedor_id):
         return jsonify(message='Erro ao registrar decisão do fornecedor.'), 500
 
     df_homologados = None
-    df_controle = None
+    controle_qualidade = None
     try:
-        df_homologados, df_controle = _carregar_planilhas_homologacao()
+        df_homologados, controle_qualidade = _carregar_planilhas_homologacao()
     except FileNotFoundError:
         pass
     except Exception as exc:
         print(f'Erro ao carregar planilhas apos decisao: {exc}')
 
-    fornecedor_payload = _montar_registro_admin(fornecedor, df_homologados, df_controle)
+    fornecedor_payload = _montar_registro_admin(fornecedor, df_homologados, controle_qualidade)
+    _atualizar_resumos_apos_escrita(fornecedor)
     return jsonify(
         message='Decisao registrada com sucesso.',
         emailEnviado=email_enviado,
@@ -2171,7 +5028,8 @@ def excluir_fornecedor(fornecedor_id):
     Endpoint para excluir um fornecedor do sistema.
     
     Remove o fornecedor do banco de dados e também exclui a pasta de arquivos
-    associada no sistema de arquivos. Requer autenticação de admin.
+    associada no sistema de arquivos. A exclusão fica no registro de eventos,
+    de onde é lida por /api/admin/fornecedores/changes. Requer autenticação de admin.
     
     Args:
         fornecedor_id: ID do fornecedor a ser excluído
@@ -2187,8 +5045,17 @@ def excluir_fornecedor(fornecedor_id):
         return jsonify(message='Fornecedor nao encontrado.'), 404
 
     try:
+        _registrar_evento(
+            'exclusao',
+            'Fornecedor excluído',
+            fornecedor.nome,
+            fornecedor_id=fornecedor.id,
+            detalhes={'email': fornecedor.email, 'cnpj': fornecedor.cnpj},
+            referencia=f'exclusao-{fornecedor.id}',
+        )
         db.session.delete(fornecedor)
         db.session.commit()
+        _CACHE_RESUMO_PORTAL.invalidar(fornecedor_id)
     except Exception as exc:
         db.session.rollback()
         print(f'Erro ao excluir fornecedor {fornecedor_id}: {exc}')
@@ -2204,6 +5071,35 @@ def excluir_fornecedor(fornecedor_id):
     return jsonify(message='Fornecedor excluido com sucesso.'), 200
 
 
+@app.route('/api/admin/planilhas/importar', methods=['POST'])
+@jwt_required()
+def importar_planilhas_admin():
+    """
+    Endpoint para importar as planilhas de homologação para o banco de dados.
+    
+    Recarrega fornecedores_homologados.xlsx e atendimento controle_qualidade.xlsx
+    nas tabelas indexadas usadas quando PLANILHAS_FONTE='banco'.
+    Requer autenticação de admin.
+    
+    Returns:
+        JSON com o total de linhas importadas (200) ou erro (403/500)
+    """
+    if not _admin_usuario_autorizado():
+        return jsonify(message='Acesso nao autorizado.'), 403
+    try:
+        total_homologados, total_controle = _importar_planilhas_para_banco()
+    except FileNotFoundError as exc:
+        return jsonify(message=str(exc)), 500
+    except Exception as exc:
+        print(f'Erro ao importar planilhas: {exc}')
+        return jsonify(message='Erro ao importar planilhas de homologação.'), 500
+    return jsonify(
+        message='Planilhas importadas com sucesso.',
+        total_homologados=total_homologados,
+        total_controle=total_controle
+    ), 200
+
+
 @app.route('/api/admin/documentos/<int:documento_id>/download', methods=['GET', 'OPTIONS'])
 @jwt_required(optional=True)
 def baixar_documento_admin(documento_id):
@@ -2247,7 +5143,9 @@ def baixar_documento_admin(documento_id):
             print(f'Erro ao enviar documento {documento_id}: {exc}')
             return jsonify(message='Erro ao baixar documento.'), 500
 
-    conteudo_memoria = documento.dados_arquivo
+    conteudo_memoria = db.session.query(Documento.dados_arquivo).filter(
+        Documento.id == documento.id
+    ).scalar()
     if not conteudo_memoria:
         caminho_fallback, dados_recuperados = _carregar_documento_de_fontes(documento)
         if dados_recuperados:
@@ -2279,90 +5177,393 @@ def baixar_documento_admin(documento_id):
     return jsonify(message='Arquivo do documento nao encontrado.'), 404
 
 
+NOTIFICACOES_LIMITE_MAXIMO = 200
+
+
+def _evento_para_notificacao(evento):
+    """
+    Converte um Evento no formato de notificação do painel admin.
+
+    Args:
+        evento: Objeto Evento
+
+    Returns:
+        Dicionário com id, tipo, titulo, descricao, timestamp e detalhes
+    """
+    return {
+        'id': evento.referencia or f'evento-{evento.id}',
+        'tipo': evento.tipo,
+        'titulo': evento.titulo,
+        'descricao': evento.descricao,
+        'timestamp': evento.criado_em.isoformat(),
+        'detalhes': evento.detalhes or {}
+    }
+
+
 @app.route('/api/admin/notificacoes', methods=['GET'])
 @jwt_required()
 def painel_admin_notificacoes():
     """
     Endpoint que retorna notificações recentes para o painel administrativo.
     
-    Compila eventos recentes do sistema: novos cadastros de fornecedores e
-    envios de documentos. Ordena por data e retorna os mais recentes.
+    Lê o registro de eventos (cadastros, envios de documentos, notas e
+    decisões), do mais recente para o mais antigo, numa única consulta pelo
+    índice de criado_em. Quando há eventos mais antigos, o header
+    X-Proximo-Cursor traz o cursor para continuar a leitura.
     Requer autenticação de admin.
     
     Query Params:
-        limit: Número máximo de notificações a retornar (padrão: 20)
+        limit: Número máximo de notificações a retornar (padrão: 20, máximo: NOTIFICACOES_LIMITE_MAXIMO)
+        cursor: Cursor devolvido pela página anterior
         
     Returns:
-        JSON com lista de eventos/notificações (200) ou erro (403/500)
+        JSON com lista de eventos/notificações (200) ou erro (400/403/500)
     """
     if not _admin_usuario_autorizado():
         return jsonify(message='Acesso não autorizado.'), 403
+    limite = min(max(request.args.get('limit', 20, type=int), 1), NOTIFICACOES_LIMITE_MAXIMO)
+    cursor = request.args.get('cursor', '', type=str).strip()
+    chave_posicao = None
+    if cursor:
+        try:
+            criado_em, evento_id = _decodificar_cursor(cursor)
+            chave_posicao = (datetime.fromisoformat(criado_em), int(evento_id))
+        except (ValueError, TypeError) as exc:
+            return jsonify(message=f'Cursor inválido: {exc}'), 400
     try:
-        limite = request.args.get('limit', 20, type=int)
-        eventos = []
-        fornecedores = Fornecedor.query.order_by(Fornecedor.data_cadastro.desc()).limit(limite).all()
-        for fornecedor in fornecedores:
-            if not fornecedor.data_cadastro:
-                continue
-            eventos.append({
-                'id': f"cadastro-{fornecedor.id}",
-                'tipo': 'cadastro',
-                'titulo': 'Novo fornecedor cadastrado',
-                'descricao': fornecedor.nome,
-                'timestamp': fornecedor.data_cadastro.isoformat(),
-                'detalhes': {
-                    'email': fornecedor.email,
-                    'cnpj': fornecedor.cnpj
-                }
-            })
-        documentos = Documento.query.order_by(Documento.data_upload.desc()).limit(limite).all()
-        for doc in documentos:
-            fornecedor = doc.fornecedor
-            if not doc.data_upload or not fornecedor:
-                continue
-            eventos.append({
-                'id': f"documento-{doc.id}",
-                'tipo': 'documento',
-                'titulo': 'Documento enviado',
-                'descricao': f"{fornecedor.nome} anexou {doc.nome_documento}",
-                'timestamp': doc.data_upload.isoformat(),
-                'detalhes': {
-                    'fornecedor': fornecedor.nome,
-                    'documento': doc.nome_documento,
-                    'categoria': doc.categoria
-                }
-            })
-        eventos.sort(key=lambda item: item['timestamp'], reverse=True)
-        eventos = eventos[:limite]
-        return jsonify(eventos), 200
+        colunas_chave = [Evento.criado_em, Evento.id]
+        query = Evento.query
+        if chave_posicao is not None:
+            query = query.filter(_filtro_apos_chave(colunas_chave, chave_posicao, descendente=True))
+        eventos = query.order_by(Evento.criado_em.desc(), Evento.id.desc()).limit(limite + 1).all()
+        proximo_cursor = None
+        if len(eventos) > limite:
+            eventos = eventos[:limite]
+            ultimo = eventos[-1]
+            proximo_cursor = _codificar_cursor([ultimo.criado_em.isoformat(), ultimo.id])
+        response = jsonify([_evento_para_notificacao(evento) for evento in eventos])
+        if proximo_cursor:
+            response.headers['X-Proximo-Cursor'] = proximo_cursor
+        return response, 200
     except Exception as exc:
         print(f'Erro ao obter notificações admin: {exc}')
         return jsonify(message='Erro ao listar notificações'), 500
     
 
+class _SinalEventos:
+    """
+    Aviso, dentro do processo, de que novos eventos foram gravados.
+
+    Os canais SSE esperam neste sinal entre uma consulta e outra: eventos
+    gravados pelo mesmo processo acordam as conexões na hora, e os gravados
+    por outros workers aparecem na consulta seguinte, no máximo
+    NOTIFICACOES_SSE_INTERVALO segundos depois.
+    """
+
+    def __init__(self):
+        self._condicao = threading.Condition()
+        self._versao = 0
+
+    @property
+    def versao(self):
+        with self._condicao:
+            return self._versao
+
+    def notificar(self):
+        with self._condicao:
+            self._versao += 1
+            self._condicao.notify_all()
+
+    def aguardar(self, versao, timeout):
+        """
+        Espera até a versão mudar ou o tempo acabar.
+
+        Args:
+            versao: Última versão vista pelo chamador
+            timeout: Tempo máximo de espera em segundos
+
+        Returns:
+            Versão atual
+        """
+        with self._condicao:
+            self._condicao.wait_for(lambda: self._versao != versao, timeout)
+            return self._versao
+
+
+_SINAL_EVENTOS = _SinalEventos()
+NOTIFICACOES_SSE_HEARTBEAT = 15
+NOTIFICACOES_SSE_LOTE = 100
+# Quantos ids abaixo do último enviado continuam sendo vigiados pelo canal SSE:
+# o id de um evento é reservado no flush, mas ele só aparece no commit, então
+# um id menor pode ficar visível depois de um maior já ter sido enviado.
+NOTIFICACOES_SSE_JANELA = 200
+
+
+@event.listens_for(Session, 'after_flush')
+def _marcar_eventos_gravados(sessao, contexto):
+    if any(isinstance(objeto, Evento) for objeto in sessao.new):
+        sessao.info['eventos_gravados'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _avisar_eventos_gravados(sessao):
+    if sessao.info.pop('eventos_gravados', False):
+        _SINAL_EVENTOS.notificar()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_aviso_eventos(sessao):
+    sessao.info.pop('eventos_gravados', None)
+
+
+def _posicao_sse(ultimo_id, lacunas):
+    """
+    Texto do campo `id` das mensagens SSE: último id enviado e ids pendentes abaixo dele.
+
+    O formato é `ultimo_id` ou `ultimo_id:lacuna,lacuna,...`, em que as lacunas
+    são ids menores ainda não entregues (de transações não confirmadas quando o
+    id maior foi enviado). O navegador devolve esse texto no Last-Event-ID.
+
+    Args:
+        ultimo_id: Maior id de evento já enviado
+        lacunas: Conjunto de ids menores ainda não enviados
+
+    Returns:
+        Texto da posição
+    """
+    if not lacunas:
+        return str(ultimo_id)
+    return f"{ultimo_id}:{','.join(map(str, sorted(lacunas)))}"
+
+
+def _ler_posicao_sse(texto):
+    """
+    Interpreta a posição devolvida em Last-Event-ID (ver _posicao_sse).
+
+    Um id simples (clientes antigos ou `ultimo_id`) não traz as lacunas; nesse
+    caso são considerados pendentes os ids da janela NOTIFICACOES_SSE_JANELA
+    que ainda não existem na tabela.
+
+    Args:
+        texto: Valor do header Last-Event-ID ou do parâmetro ultimo_id
+
+    Returns:
+        Tupla (ultimo_id, conjunto de lacunas)
+
+    Raises:
+        ValueError: Se o texto não for uma posição válida
+    """
+    ultimo, _, lacunas = texto.strip().partition(':')
+    ultimo_id = int(ultimo)
+    if lacunas:
+        pendentes = {int(valor) for valor in lacunas.split(',')}
+        return ultimo_id, {
+            pendente for pendente in pendentes
+            if ultimo_id - NOTIFICACOES_SSE_JANELA < pendente < ultimo_id
+        }
+    return ultimo_id, _ids_ausentes_eventos(ultimo_id)
+
+
+def _ids_ausentes_eventos(ultimo_id):
+    """
+    Ids da janela NOTIFICACOES_SSE_JANELA abaixo de `ultimo_id` que não existem em eventos.
+
+    Args:
+        ultimo_id: Id de referência
+
+    Returns:
+        Conjunto de ids ausentes (ainda não confirmados ou descartados)
+    """
+    inicio = max(ultimo_id - NOTIFICACOES_SSE_JANELA + 1, 1)
+    existentes = {
+        evento_id for (evento_id,) in
+        db.session.query(Evento.id).filter(Evento.id >= inicio, Evento.id < ultimo_id)
+    }
+    return set(range(inicio, ultimo_id)) - existentes
+
+
+def _formatar_evento_sse(evento_id, dados):
+    """
+    Formata uma mensagem Server-Sent Events.
+
+    Args:
+        evento_id: Posição (ver _posicao_sse) devolvida pelo navegador no header
+            Last-Event-ID ao reconectar
+        dados: Dicionário enviado como JSON no campo data
+
+    Returns:
+        Texto da mensagem, terminado por linha em branco
+    """
+    return f"id: {evento_id}\ndata: {app.json.dumps(dados)}\n\n"
+
+
+@app.route('/api/admin/notificacoes/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def painel_admin_notificacoes_stream():
+    """
+    Canal Server-Sent Events com as notificações do painel administrativo.
+
+    Envia cada novo evento (cadastro, documento, nota, decisão) no formato de
+    /api/admin/notificacoes assim que é gravado, com o id do evento no campo
+    `id`. Ao reconectar, o navegador manda o header Last-Event-ID e recebe os
+    eventos perdidos. Sem ele (ou `ultimo_id`), começa pelos eventos gravados
+    após a conexão. Como um evento de id menor pode ser confirmado depois de
+    um de id maior, o campo `id` também leva os ids menores ainda pendentes
+    (ver _posicao_sse), e o canal continua procurando por eles; assim nenhum
+    evento é pulado nem enviado duas vezes, inclusive após reconectar. A
+    conexão é encerrada após NOTIFICACOES_SSE_DURACAO segundos, e o
+    EventSource reconecta sozinho.
+    Cada conexão ocupa uma thread do worker enquanto está aberta, por isso o
+    gunicorn roda com --worker-class gthread (ver Procfile); com o worker sync
+    padrão, um único painel aberto bloquearia todas as outras requisições.
+    Requer autenticação de admin (header Authorization ou `?jwt=`, já que o
+    EventSource do navegador não envia headers).
+
+    Query Params:
+        ultimo_id: ID (ou posição) do último evento já recebido (alternativa ao Last-Event-ID)
+
+    Returns:
+        Fluxo text/event-stream (200) ou erro (400/403)
+    """
+    if not _admin_usuario_autorizado():
+        return jsonify(message='Acesso não autorizado.'), 403
+    ultimo_informado = request.headers.get('Last-Event-ID') or request.args.get('ultimo_id')
+    if ultimo_informado:
+        try:
+            ultimo_id, lacunas = _ler_posicao_sse(ultimo_informado)
+        except ValueError:
+            return jsonify(message='Last-Event-ID inválido.'), 400
+    else:
+        ultimo_id = db.session.query(func.max(Evento.id)).scalar() or 0
+        lacunas = _ids_ausentes_eventos(ultimo_id)
+    db.session.close()
+    intervalo = float(app.config.get('NOTIFICACOES_SSE_INTERVALO', 1))
+    duracao = float(app.config.get('NOTIFICACOES_SSE_DURACAO', 300))
+
+    def gerar():
+        nonlocal ultimo_id, lacunas
+        yield f"retry: {int(intervalo * 1000)}\n\n"
+        inicio = ultimo_envio = time.monotonic()
+        versao = _SINAL_EVENTOS.versao
+        while time.monotonic() - inicio < duracao:
+            filtro = Evento.id > ultimo_id
+            if lacunas:
+                filtro = or_(filtro, Evento.id.in_(sorted(lacunas)))
+            eventos = (
+                Evento.query.filter(filtro)
+                .order_by(Evento.id)
+                .limit(NOTIFICACOES_SSE_LOTE)
+                .all()
+            )
+            mensagens = []
+            for evento in eventos:
+                if evento.id in lacunas:
+                    lacunas.discard(evento.id)
+                elif evento.id > ultimo_id:
+                    lacunas.update(range(max(ultimo_id + 1, evento.id - NOTIFICACOES_SSE_JANELA + 1), evento.id))
+                    ultimo_id = evento.id
+                else:
+                    continue
+                lacunas = {pendente for pendente in lacunas if pendente > ultimo_id - NOTIFICACOES_SSE_JANELA}
+                mensagens.append(
+                    _formatar_evento_sse(_posicao_sse(ultimo_id, lacunas), _evento_para_notificacao(evento))
+                )
+            db.session.close()
+            if eventos:
+                ultimo_envio = time.monotonic()
+                yield ''.join(mensagens)
+                if len(eventos) == NOTIFICACOES_SSE_LOTE:
+                    continue
+            elif time.monotonic() - ultimo_envio >= NOTIFICACOES_SSE_HEARTBEAT:
+                ultimo_envio = time.monotonic()
+                yield ': ping\n\n'
+            versao = _SINAL_EVENTOS.aguardar(versao, intervalo)
+
+    response = Response(stream_with_context(gerar()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+FORNECEDORES_PUBLICO_LIMITE_MAXIMO = 100
+# A relevância da busca entra na chave de paginação arredondada para um inteiro
+# nessa escala, para que o cursor não dependa da representação de floats.
+FORNECEDORES_PUBLICO_ESCALA_RELEVANCIA = 1000000
+
+
 @app.route('/api/fornecedores', methods=['GET'])
 def listar_fornecedores():
     """
     Endpoint público para listar fornecedores (com busca opcional).
     
     Retorna uma lista simplificada de fornecedores cadastrados, com opção de
-    filtrar por nome. Endpoint público, não requer autenticação.
+    filtrar por nome ou CNPJ (busca indexada, sem diferenciar acentos, com os
+    resultados mais relevantes primeiro). Endpoint público, não requer autenticação.
+    A lista é sempre paginada por chave (keyset), com no máximo
+    FORNECEDORES_PUBLICO_LIMITE_MAXIMO itens por página: o cursor da próxima
+    página vem no header X-Proximo-Cursor e, na primeira página, o total de
+    fornecedores encontrados vem em X-Total-Count. Na busca, a chave é
+    (relevância arredondada, nome, id). A consulta lê só as quatro colunas
+    retornadas, sem montar objetos do ORM.
     
     Query Params:
         nome: Nome opcional para filtrar fornecedores
+        limit: Tamanho da página (padrão e máximo: FORNECEDORES_PUBLICO_LIMITE_MAXIMO)
+        cursor: Cursor devolvido pela página anterior
         
     Returns:
-        JSON com lista de fornecedores (id, nome, email, cnpj)
+        JSON com lista de fornecedores (id, nome, email, cnpj) (200) ou erro (400)
     """
-    nome = request.args.get('nome', '')
-    print(f"Buscando fornecedores com nome: {nome}")
+    nome = request.args.get('nome', '').strip()
+    app.logger.debug(f'Buscando fornecedores com nome: {nome}')
+    limite = request.args.get('limit', FORNECEDORES_PUBLICO_LIMITE_MAXIMO, type=int)
+    limite = min(max(limite, 1), FORNECEDORES_PUBLICO_LIMITE_MAXIMO)
+    cursor = request.args.get('cursor', '', type=str).strip()
+    chave_posicao = None
+    if cursor:
+        try:
+            dados_cursor = _decodificar_cursor(cursor)
+            if not isinstance(dados_cursor, dict) or dados_cursor.get('nome') != nome:
+                raise ValueError('Cursor não corresponde à busca informada.')
+            chave_posicao = list(dados_cursor['chave'])
+        except (ValueError, TypeError, KeyError) as exc:
+            return jsonify(message=f'Cursor inválido: {exc}'), 400
+        tipos_chave = (int, str, int) if nome else (int,)
+        if len(chave_posicao) != len(tipos_chave) or any(
+            isinstance(valor, bool) or not isinstance(valor, tipo)
+            for valor, tipo in zip(chave_posicao, tipos_chave)
+        ):
+            return jsonify(message='Cursor inválido: chave incompatível.'), 400
+    consulta = select(Fornecedor.id, Fornecedor.nome, Fornecedor.email, Fornecedor.cnpj)
+    colunas_chave = [Fornecedor.id]
     if nome:
-        fornecedores = Fornecedor.query.filter(Fornecedor.nome.ilike(f'%{nome}%')).all()
+        consulta, relevancia = _filtrar_busca_fornecedores(consulta, nome)
+        chave_relevancia = -cast(func.round(relevancia * FORNECEDORES_PUBLICO_ESCALA_RELEVANCIA), Integer)
+        colunas_chave = [chave_relevancia, Fornecedor.nome, Fornecedor.id]
+        consulta = consulta.add_columns(chave_relevancia.label('chave_relevancia'))
+    total = None
+    if chave_posicao is None:
+        total = db.session.execute(select(func.count()).select_from(consulta.subquery())).scalar()
     else:
-        fornecedores = Fornecedor.query.all()
-    print(f"Fornecedores encontrados: {len(fornecedores)}")
-    lista = [{"id": f.id, "nome": f.nome, "email": f.email, "cnpj": f.cnpj} for f in fornecedores]
-    return jsonify(lista)
+        consulta = consulta.where(_filtro_apos_chave(colunas_chave, chave_posicao))
+    linhas = db.session.execute(consulta.order_by(*colunas_chave).limit(limite + 1)).all()
+    proximo_cursor = None
+    if len(linhas) > limite:
+        linhas = linhas[:limite]
+        ultima = linhas[-1]
+        chave = [ultima.chave_relevancia, ultima.nome, ultima.id] if nome else [ultima.id]
+        proximo_cursor = _codificar_cursor({'nome': nome, 'chave': chave})
+    response = jsonify([
+        {"id": linha.id, "nome": linha.nome, "email": linha.email, "cnpj": linha.cnpj}
+        for linha in linhas
+    ])
+    if total is not None:
+        response.headers['X-Total-Count'] = str(total)
+    if proximo_cursor:
+        response.headers['X-Proximo-Cursor'] = proximo_cursor
+    return response
+
+
 def enviar_email_documento(fornecedor_nome, documento_nome, categoria, destinatario, link_documento, arquivos_paths=None):
     """
     Envia e-mail notificando sobre novos documentos enviados por um fornecedor.
@@ -2783,5 +5984,13 @@ def gerar_token_recuperacao():
         Inteiro de 6 dígitos representando o token
     """
     return random.randint(100000, 999999)
+with app.app_context():
+    _ensure_fornecedor_colunas_derivadas()
+    _ensure_busca_fornecedores()
+_SNAPSHOT_CLAF.carregar_em_segundo_plano()
+if not _planilhas_no_banco():
+    _SNAPSHOT_HOMOLOGACAO.carregar_em_segundo_plano()
+_ATUALIZADOR_RESUMOS.agendar()
+
 if __name__ == '__main__':
     app.run(debug=True)
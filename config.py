@@ -25,6 +25,21 @@ class Config:
         'pool_recycle': _pool_recycle,
     }
 
+    # 'arquivo' consulta as planilhas xlsx; 'banco' usa as tabelas importadas com `flask importar-planilhas`
+    PLANILHAS_FONTE = os.environ.get('PLANILHAS_FONTE', 'arquivo').strip().lower()
+    # Intervalo mínimo (segundos) entre verificações de alteração das planilhas em disco
+    PLANILHAS_INTERVALO_VERIFICACAO = float(os.environ.get('PLANILHAS_INTERVALO_VERIFICACAO', '5'))
+
+    # Canal SSE de notificações: intervalo máximo (segundos) entre consultas de novos eventos
+    # e duração máxima de cada conexão, após a qual o navegador reconecta com Last-Event-ID.
+    # Cada conexão aberta ocupa uma thread do servidor durante toda a duração: o gunicorn
+    # precisa rodar com workers de threads (gthread, ver Procfile) ou gevent, nunca só sync
+    NOTIFICACOES_SSE_INTERVALO = float(os.environ.get('NOTIFICACOES_SSE_INTERVALO', '1'))
+    NOTIFICACOES_SSE_DURACAO = float(os.environ.get('NOTIFICACOES_SSE_DURACAO', '300'))
+
+    # Quantidade máxima de resumos do portal mantidos em cache (LRU) por processo
+    PORTAL_RESUMO_CACHE_TAMANHO = int(os.environ.get('PORTAL_RESUMO_CACHE_TAMANHO', 2048))
+
     MAIL_SERVER = os.environ.get('MAIL_SERVER', 'smtp.office365.com')
     MAIL_PORT = int(os.environ.get('MAIL_PORT', 587))
     MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS', 'true').lower() in {'true', '1', 'yes'}
@@ -10,6 +10,8 @@ class Fornecedor(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=False)
+    # E-mail em minúsculas e sem espaços, mantido pela aplicação para login e buscas.
+    email_normalizado = db.Column(db.String(100), nullable=True, unique=True, index=True)
     cnpj = db.Column(db.String(18), unique=True, nullable=False)
     senha = db.Column(db.String(256), nullable=False)
 
@@ -18,6 +20,11 @@ class Fornecedor(db.Model):
 
     categoria = db.Column(db.String(100), nullable=True)
     data_cadastro = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True, index=True)
+    # Nome normalizado (minúsculas, sem acentos) mantido pela aplicação para a busca.
+    nome_busca = db.Column(db.String(100), nullable=True)
+    # CNPJ só com dígitos, mantido pela aplicação para comparações e consultas.
+    cnpj_digitos = db.Column(db.String(14), nullable=True, index=True)
 
     documentos = db.relationship(
         'Documento',
@@ -37,6 +44,12 @@ class Fornecedor(db.Model):
         uselist=False,
         cascade='all, delete-orphan'
     )
+    resumo = db.relationship(
+        'ResumoFornecedor',
+        backref='fornecedor',
+        uselist=False,
+        cascade='all, delete-orphan'
+    )
 
     def __init__(self, nome, email, cnpj, senha, **kwargs):
         super().__init__(**kwargs)
@@ -53,8 +66,11 @@ class Documento(db.Model):
     nome_documento = db.Column(db.String(100), nullable=False)
     categoria = db.Column(db.String(50), nullable=False)
     data_upload = db.Column(db.DateTime, default=datetime.utcnow)
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True, index=True)
     mime_type = db.Column(db.String(255), nullable=True)
-    dados_arquivo = db.Column(db.LargeBinary, nullable=True)
+    # Conteúdo binário só é carregado sob demanda (undefer ou consulta da coluna);
+    # acessá-lo num objeto carregado sem ele levanta erro em vez de buscar o blob.
+    dados_arquivo = db.deferred(db.Column(db.LargeBinary, nullable=True), raiseload=True)
 
     fornecedor_id = db.Column(db.Integer, db.ForeignKey('fornecedores.id'), nullable=False)
 
@@ -81,9 +97,75 @@ class NotaFornecedor(db.Model):
         unique=True
     )
     nota_homologacao = db.Column(db.Float, nullable=True)
-    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
     status_decisao = db.Column(db.String(20), nullable=True)
     observacao_admin = db.Column(db.Text, nullable=True)
     nota_referencia = db.Column(db.Float, nullable=True)
     email_enviado = db.Column(db.Boolean, default=False, nullable=False)
     decisao_atualizada_em = db.Column(db.DateTime, nullable=True)
+
+
+class ResumoFornecedor(db.Model):
+    __tablename__ = 'resumos_fornecedores'
+
+    fornecedor_id = db.Column(db.Integer, db.ForeignKey('fornecedores.id'), primary_key=True)
+    status = db.Column(db.String(20), nullable=False, index=True)
+    nota_iqf = db.Column(db.Float, nullable=True)
+    nota_homologacao = db.Column(db.Float, nullable=True)
+    ultima_atividade = db.Column(db.DateTime, nullable=True)
+    versao_planilhas = db.Column(db.String(64), nullable=True)
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+# Registro somente de inclusão: eventos não são alterados nem removidos, nem
+# quando o fornecedor é excluído (por isso fornecedor_id não tem chave estrangeira).
+class Evento(db.Model):
+    __tablename__ = 'eventos'
+
+    id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(30), nullable=False)
+    referencia = db.Column(db.String(60), nullable=True)
+    fornecedor_id = db.Column(db.Integer, nullable=True, index=True)
+    titulo = db.Column(db.String(120), nullable=False)
+    descricao = db.Column(db.String(255), nullable=True)
+    detalhes = db.Column(db.JSON, nullable=True)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+class PlanilhaHomologado(db.Model):
+    __tablename__ = 'planilha_homologados'
+
+    id = db.Column(db.Integer, primary_key=True)
+    linha = db.Column(db.Integer, nullable=False, index=True)
+    codigo = db.Column(db.Integer, nullable=True)
+    agente = db.Column(db.String(255), nullable=True)
+    agente_normalizado = db.Column(db.String(255), nullable=True, index=True)
+    nome_fantasia = db.Column(db.String(255), nullable=True)
+    nome_fantasia_normalizado = db.Column(db.String(255), nullable=True, index=True)
+    cnpj = db.Column(db.String(32), nullable=True, index=True)
+    cnpj_digitos = db.Column(db.String(14), nullable=True, index=True)
+    aprovado = db.Column(db.String(10), nullable=True)
+    nota_homologacao = db.Column(db.Float, nullable=True)
+    iqf = db.Column(db.Float, nullable=True)
+
+
+class PlanilhaControleQualidade(db.Model):
+    __tablename__ = 'planilha_controle_qualidade'
+
+    id = db.Column(db.Integer, primary_key=True)
+    linha = db.Column(db.Integer, nullable=False, index=True)
+    nome_agente = db.Column(db.String(255), nullable=True)
+    nome_agente_normalizado = db.Column(db.String(255), nullable=True, index=True)
+    nome_agente_chave = db.Column(db.String(255), nullable=True, index=True)
+    nota = db.Column(db.Float, nullable=True)
+    observacao = db.Column(db.Text, nullable=True)
+
+
+# Uma linha por importação das planilhas para o banco (`flask importar-planilhas`);
+# a versão da importação mais recente identifica o conteúdo das tabelas planilha_*.
+class ImportacaoPlanilhas(db.Model):
+    __tablename__ = 'importacoes_planilhas'
+
+    id = db.Column(db.Integer, primary_key=True)
+    versao = db.Column(db.String(32), nullable=False, unique=True)
+    importado_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,39 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+# O app cria o banco e carrega as planilhas ao ser importado: o banco de teste
+# precisa estar configurado antes do primeiro import.
+_DIRETORIO_BANCO = tempfile.mkdtemp(prefix='fornecedores-testes-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_DIRETORIO_BANCO, 'fornecedores.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as modulo_app  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    modulo_app.app.config['TESTING'] = True
+    return modulo_app.app
+
+
+@pytest.fixture(scope='session')
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(scope='session')
+def admin_headers(client):
+    resposta = client.post(
+        '/api/admin/login',
+        json={'email': min(modulo_app.ADMIN_ALLOWED_EMAILS), 'senha': modulo_app.ADMIN_PASSWORD},
+    )
+    assert resposta.status_code == 200, resposta.get_json()
+    return {'Authorization': f"Bearer {resposta.get_json()['access_token']}"}
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_DIRETORIO_BANCO, ignore_errors=True)
@@ -0,0 +1,106 @@
+"""
+Número de consultas SQL da listagem admin de fornecedores.
+
+A listagem carrega documentos, notas e resumos em lote (selectinload / join);
+o número de consultas deve ser o mesmo para 5, 50 ou 200 fornecedores.
+"""
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+import app as modulo_app
+from models import Documento, Fornecedor, NotaFornecedor
+
+TAMANHOS = (5, 50, 200)
+
+
+@contextmanager
+def contar_consultas():
+    """
+    Conta os comandos SQL executados pela thread atual.
+
+    Threads em segundo plano do app (recarga de planilhas, resumos) são
+    ignoradas, para que a contagem seja só a da requisição.
+    """
+    with modulo_app.app.app_context():
+        engine = modulo_app.db.engine
+    thread = threading.get_ident()
+    comandos = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == thread:
+            comandos.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', registrar)
+    try:
+        yield comandos
+    finally:
+        event.remove(engine, 'before_cursor_execute', registrar)
+
+
+def _completar_fornecedores(total):
+    """
+    Garante `total` fornecedores no banco, cada um com documentos e nota.
+    """
+    db = modulo_app.db
+    existentes = Fornecedor.query.count()
+    base = datetime(2025, 1, 1)
+    for indice in range(existentes, total):
+        fornecedor = Fornecedor(
+            nome=f'Fornecedor Teste {indice:03d}',
+            email=f'fornecedor{indice}@teste.com',
+            cnpj=f'{indice:02d}.000.000/0001-{indice % 100:02d}',
+            senha='x',
+            categoria='Materiais' if indice % 2 else None,
+            data_cadastro=base + timedelta(days=indice),
+        )
+        db.session.add(fornecedor)
+        db.session.flush()
+        for ordem in range(2):
+            db.session.add(Documento(
+                nome_documento=f'doc_{indice}_{ordem}.pdf',
+                categoria='Materiais',
+                fornecedor_id=fornecedor.id,
+                mime_type='application/pdf',
+                dados_arquivo=b'%PDF',
+                data_upload=base + timedelta(days=indice, hours=ordem + 1),
+            ))
+        db.session.add(NotaFornecedor(fornecedor_id=fornecedor.id, nota_homologacao=80.0))
+    db.session.commit()
+    modulo_app._atualizar_resumos_fornecedores()
+
+
+CONSULTAS = {
+    'completa': {},
+    'status': {'sort': 'status', 'limit': 200},
+    'iqf_filtrada': {'sort': 'iqf', 'order': 'desc', 'status': 'APROVADO,REPROVADO,EM_ANALISE', 'limit': 200},
+    'busca': {'search': 'fornecedor', 'limit': 200},
+}
+
+
+@pytest.fixture(scope='module')
+def contagens(app, client, admin_headers):
+    """
+    Número de consultas de cada listagem em CONSULTAS, para cada tamanho de TAMANHOS.
+    """
+    resultado = {nome: {} for nome in CONSULTAS}
+    for total in TAMANHOS:
+        with app.app_context():
+            _completar_fornecedores(total)
+        for nome, parametros in CONSULTAS.items():
+            with contar_consultas() as comandos:
+                resposta = client.get('/api/admin/fornecedores', query_string=parametros, headers=admin_headers)
+                fornecedores = resposta.get_json()
+            assert resposta.status_code == 200, fornecedores
+            assert len(fornecedores) == total
+            resultado[nome][total] = len(comandos)
+    return resultado
+
+
+@pytest.mark.parametrize('consulta', CONSULTAS)
+def test_listagem_admin_numero_constante_de_consultas(contagens, consulta):
+    assert len(set(contagens[consulta].values())) == 1, contagens[consulta]
+